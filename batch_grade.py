@@ -0,0 +1,165 @@
+"""
+functions to grade many submitted solutions on a pool of processes.
+
+A submission is a MoveSequence meant to move number_of_cheeses cheeses
+from the first of number_of_stools stools to the last. Each is checked
+with check_moves, which finds the first illegal move and where every
+cheese ends up without building a TOAHModel, and its length is compared
+with the optimum from the Frame-Stewart table.
+
+Submissions are sent to the worker processes in tasks, each carrying
+only its own submissions, so each one is pickled once, for the worker
+that grades it. Long submissions go out first, on their own, and short
+ones in groups. Each worker takes the next task as soon as it finishes
+one, so a few long submissions do not hold up the rest, and grades come
+back as tasks finish, not in submission order.
+"""
+
+
+# Copyright 2013, 2014, 2017 Gary Baumgartner, Danny Heap, Dustin Wehr,
+# Bogdan Simion, Jacqueline Smith, Dan Zingaro
+# Distributed under the terms of the GNU General Public License.
+#
+# This file is part of Assignment 1, CSC148, Winter 2017.
+#
+# This is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This file is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this file.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import multiprocessing
+from move_check import check_moves
+from tour import min_number_of_moves
+
+# Short submissions are grouped until a task has at least this many moves,
+# or fewer for a small batch, so that grading a task outweighs the cost of
+# sending it to a worker and its grades back.
+GROUP_MOVES = 1 << 16
+
+
+def grade(move_seq, number_of_stools, number_of_cheeses):
+    """ Return the grade of move_seq as a solution moving number_of_cheeses
+    cheeses from the first of number_of_stools stools to the last:
+
+    - "valid": whether every move is legal and every cheese ends on the
+      last stool
+    - "illegal_move": the index of the first illegal move, or None
+    - "moves": the number of moves made before it, or all of them
+    - "extra_moves": the number of moves more than the fewest possible,
+      or None if move_seq is not valid
+
+    @type move_seq: MoveSequence
+    @type number_of_stools: int
+    @type number_of_cheeses: int
+    @rtype: dict[str, bool | int | None]
+
+    >>> from toah_model import MoveSequence
+    >>> grade(MoveSequence([(0, 1), (0, 2), (1, 2)]), 3, 2)["extra_moves"]
+    0
+    >>> sorted(grade(MoveSequence([(0, 1), (0, 1)]), 3, 2).items())
+    [('extra_moves', None), ('illegal_move', 1), ('moves', 1), \
+('valid', False)]
+    """
+    (illegal_move, locations) = check_moves(move_seq, number_of_stools,
+                                            number_of_cheeses)
+    valid = illegal_move is None and all(
+        location == number_of_stools - 1 for location in locations)
+    moves = move_seq.length() if illegal_move is None else illegal_move
+    return {"valid": valid,
+            "illegal_move": illegal_move,
+            "moves": moves,
+            "extra_moves": moves - min_number_of_moves(
+                number_of_cheeses, number_of_stools) if valid else None}
+
+
+def _grade_task(task):
+    """ Return the index and grade of each submission in task.
+
+    @type task: tuple[int, int, list[tuple[int, MoveSequence]]]
+        number of stools, number of cheeses, and (index, submission) pairs
+    @rtype: list[tuple[int, dict]]
+    """
+    (number_of_stools, number_of_cheeses, submissions) = task
+    return [(index, grade(move_seq, number_of_stools, number_of_cheeses))
+            for (index, move_seq) in submissions]
+
+
+def split_batch(lengths, min_moves):
+    """ Return tasks, as lists of indices into lengths, that cover every
+    submission, longest first, grouping shorter ones until a task has at
+    least min_moves moves.
+
+    @type lengths: list[int]
+        number of moves in each submission
+    @type min_moves: int
+    @rtype: list[list[int]]
+
+    >>> split_batch([3, 10, 1, 4, 2], 5)
+    [[1], [3, 0], [4, 2]]
+    """
+    tasks = []
+    (task, moves) = ([], 0)
+    for index in sorted(range(len(lengths)), key=lambda i: -lengths[i]):
+        task.append(index)
+        moves += lengths[index]
+        if moves >= min_moves:
+            tasks.append(task)
+            (task, moves) = ([], 0)
+    if task:
+        tasks.append(task)
+    return tasks
+
+
+def grade_batch(submissions, number_of_stools, number_of_cheeses,
+                processes=None):
+    """ Grade each of submissions, as grade does, on a pool of processes,
+    and yield (index in submissions, grade) pairs as they are finished.
+
+    @type submissions: list[MoveSequence]
+    @type number_of_stools: int
+    @type number_of_cheeses: int
+    @type processes: int | None
+        number of worker processes, or None for one per CPU
+    @rtype: iterator[tuple[int, dict]]
+
+    >>> from toah_model import MoveSequence
+    >>> from tour import iter_tour_moves
+    >>> tour = list(iter_tour_moves(6, [0, 3, 1, 2]))
+    >>> submissions = [MoveSequence(tour), MoveSequence(tour[:-1]),
+    ...                MoveSequence([(0, 3)] + tour), MoveSequence([(1, 2)])]
+    >>> grades = dict(grade_batch(submissions, 4, 6, processes=2))
+    >>> [(grades[i]["valid"], grades[i]["illegal_move"]) for i in range(4)]
+    [(True, None), (False, None), (False, 1), (False, 0)]
+    """
+    if not submissions:
+        return
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    lengths = [move_seq.length() for move_seq in submissions]
+    # a small batch still makes about eight groups for each worker, so the
+    # short submissions can fill in around the long ones
+    group_moves = max(1, min(GROUP_MOVES, sum(lengths) // (8 * processes)))
+    tasks = ((number_of_stools, number_of_cheeses,
+              [(index, submissions[index]) for index in indices])
+             for indices in split_batch(lengths, group_moves))
+    with multiprocessing.Pool(processes) as pool:
+        for grades in pool.imap_unordered(_grade_task, tasks):
+            yield from grades
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
+    # Leave lines below to see what python_ta checks.
+    # File batchgrade_pyta.txt must be in same folder.
+    import python_ta
+    python_ta.check_all(config="batchgrade_pyta.txt")
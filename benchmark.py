@@ -0,0 +1,312 @@
+"""
+Benchmarks for the solver, model and replay hot paths.
+
+Each benchmark reports its wall time (best of several runs), its peak
+traced memory and, where it makes moves, moves per second. Results are
+written as JSON and can be compared against a stored baseline, in which
+case any benchmark that got slower or bigger than the tolerance allows
+makes the run fail.
+
+Run as a script; see --help for options.
+"""
+
+
+# Copyright 2013, 2014, 2017 Gary Baumgartner, Danny Heap, Dustin Wehr,
+# Bogdan Simion, Jacqueline Smith, Dan Zingaro
+# Distributed under the terms of the GNU General Public License.
+#
+# This file is part of Assignment 1, CSC148, Winter 2017.
+#
+# This is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This file is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this file.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import tour
+from move_check import check_moves
+from toah_model import TOAHModel, TOAHRenderer, MoveSequence
+
+# Numbers of cheeses for the tour sweep.
+TOUR_SIZES = (10, 20, 40, 60, 80, 100)
+# Number of cheeses for the model, replay and rendering benchmarks.
+REPLAY_CHEESES = 100
+RENDER_CHEESES = 2000
+RENDER_MOVES = 1000
+# Wall time changes smaller than this many seconds are never regressions.
+MIN_TIME_CHANGE = 0.005
+
+
+def _reset_move_tables():
+    """ Forget the Frame-Stewart tables so they are rebuilt from scratch.
+
+    @rtype: None
+    """
+    tour._MIN_MOVES.clear()
+    tour._MIN_MOVE_I.clear()
+
+
+def _tour_moves(number_of_cheeses):
+    """ Return the four-stool tour of number_of_cheeses as a list.
+
+    @type number_of_cheeses: int
+    @rtype: list[tuple[int]]
+    """
+    return list(tour.iter_tour_moves(number_of_cheeses, [0, 3, 1, 2]))
+
+
+def _bench_move_table(number_of_cheeses):
+    """ Build the Frame-Stewart table for number_of_cheeses from scratch.
+
+    @type number_of_cheeses: int
+    @rtype: None
+    """
+    _reset_move_tables()
+    split = tour.generate_min_move_i(number_of_cheeses)
+    tour.move_n(number_of_cheeses, split)
+
+
+def _bench_tour(number_of_cheeses):
+    """ Run tour_of_four_stools on a fresh model; return its move count.
+
+    @type number_of_cheeses: int
+    @rtype: int
+    """
+    model = TOAHModel(4)
+    model.fill_first_stool(number_of_cheeses)
+    tour.tour_of_four_stools(model, delay_btw_moves=0)
+    return model.number_of_moves()
+
+
+def _bench_model_move(moves):
+    """ Apply moves one by one through TOAHModel.move; return their count.
+
+    @type moves: list[tuple[int]]
+    @rtype: int
+    """
+    model = TOAHModel(4)
+    model.fill_first_stool(REPLAY_CHEESES)
+    for (src_stool, dst_stool) in moves:
+        model.move(src_stool, dst_stool)
+    return len(moves)
+
+
+def _bench_replay(move_seq):
+    """ Replay move_seq with generate_toah_model; return its length.
+
+    @type move_seq: MoveSequence
+    @rtype: int
+    """
+    move_seq.generate_toah_model(4, REPLAY_CHEESES)
+    return move_seq.length()
+
+
+def _bench_check(move_seq):
+    """ Check move_seq with check_moves; return its length.
+
+    @type move_seq: MoveSequence
+    @rtype: int
+    """
+    check_moves(move_seq, 4, REPLAY_CHEESES)
+    return move_seq.length()
+
+
+def _bench_str(model):
+    """ Render model with TOAHModel.__str__.
+
+    @type model: TOAHModel
+    @rtype: None
+    """
+    str(model)
+
+
+def _bench_render_moves(moves):
+    """ Render a model with a TOAHRenderer after each of moves; return
+    their count.
+
+    @type moves: list[tuple[int]]
+    @rtype: int
+    """
+    model = TOAHModel(4)
+    model.fill_first_stool(REPLAY_CHEESES)
+    renderer = TOAHRenderer(model)
+    for (src_stool, dst_stool) in moves:
+        model.move(src_stool, dst_stool)
+        renderer.render()
+    return len(moves)
+
+
+def benchmark_cases():
+    """ Return the benchmarks to run, as (name, function, argument) triples.
+    A function returns the number of moves it made, or None.
+
+    @rtype: list[tuple[str, function, object]]
+    """
+    cases = [("move_table_n{0}".format(n), _bench_move_table, n)
+             for n in (1000, 5000)]
+    cases += [("tour_of_four_stools_n{0}".format(n), _bench_tour, n)
+              for n in TOUR_SIZES]
+    moves = _tour_moves(REPLAY_CHEESES)
+    cases.append(("toah_model_move_n{0}".format(REPLAY_CHEESES),
+                  _bench_model_move, moves))
+    cases.append(("generate_toah_model_n{0}".format(REPLAY_CHEESES),
+                  _bench_replay, MoveSequence(moves)))
+    cases.append(("check_moves_n{0}".format(REPLAY_CHEESES),
+                  _bench_check, MoveSequence(moves)))
+    render_model = TOAHModel(4)
+    render_model.fill_stools([size % 4 for size in range(RENDER_CHEESES)])
+    cases.append(("toah_model_str_n{0}".format(RENDER_CHEESES),
+                  _bench_str, render_model))
+    cases.append(("toah_renderer_moves_n{0}".format(REPLAY_CHEESES),
+                  _bench_render_moves, moves[:RENDER_MOVES]))
+    return cases
+
+
+def run_benchmark(function, argument, repeat):
+    """ Run function(argument) repeat times for timing and once more under
+    tracemalloc, and return its results.
+
+    @type function: function
+    @type argument: object
+    @type repeat: int
+    @rtype: dict[str, float | int | None]
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        moves = function(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        function(argument)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"wall_time": best,
+            "peak_memory": peak_memory,
+            "moves": moves,
+            "moves_per_sec": moves / best if moves and best else None}
+
+
+def run_benchmarks(repeat=3, names=None):
+    """ Run every benchmark (or those whose name contains one of names)
+    and return their results by name.
+
+    @type repeat: int
+    @type names: list[str] | None
+    @rtype: dict[str, dict]
+    """
+    results = {}
+    for (name, function, argument) in benchmark_cases():
+        if names and not any(part in name for part in names):
+            continue
+        results[name] = run_benchmark(function, argument, repeat)
+    return results
+
+
+def find_regressions(results, baseline, tolerance):
+    """ Return a description of every benchmark in both results and
+    baseline whose wall time or peak memory grew by more than tolerance
+    (a fraction) over the baseline. Wall times within MIN_TIME_CHANGE of
+    the baseline are left alone, since short runs are noisy.
+
+    @type results: dict[str, dict]
+    @type baseline: dict[str, dict]
+    @type tolerance: float
+    @rtype: list[str]
+
+    >>> old = {"a": {"wall_time": 1.0, "peak_memory": 100}}
+    >>> new = {"a": {"wall_time": 1.5, "peak_memory": 100}}
+    >>> find_regressions(new, old, 0.25)
+    ['a: wall_time 1.5 > 1 (+50%)']
+    >>> find_regressions(new, old, 0.5)
+    []
+    """
+    regressions = []
+    for (name, result) in sorted(results.items()):
+        if name not in baseline:
+            continue
+        for key in ("wall_time", "peak_memory"):
+            (old, new) = (baseline[name][key], result[key])
+            if key == "wall_time" and new - old < MIN_TIME_CHANGE:
+                continue
+            if old and new > old * (1 + tolerance):
+                regressions.append("{0}: {1} {2:.4g} > {3:.4g} (+{4:.0%})"
+                                   .format(name, key, new, old,
+                                           new / old - 1))
+    return regressions
+
+
+def main(argv=None):
+    """ Run the benchmarks from the command line; return the exit status,
+    which is 1 if any benchmark regressed against the baseline.
+
+    @type argv: list[str] | None
+    @rtype: int
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="file to write results to")
+    parser.add_argument("--baseline", default="benchmark_baseline.json",
+                        help="stored results to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed fractional slowdown or growth")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per benchmark")
+    parser.add_argument("names", nargs="*",
+                        help="only run benchmarks whose name contains one")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.repeat, args.names)
+    report = {"python": platform.python_version(),
+              "machine": platform.machine(),
+              "results": results}
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+    for (name, result) in sorted(results.items()):
+        print("{0:32} {1:10.4f}s {2:12,d}B {3}".format(
+            name, result["wall_time"], result["peak_memory"],
+            "" if result["moves_per_sec"] is None else
+            "{0:,.0f} moves/s".format(result["moves_per_sec"])))
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2, sort_keys=True)
+        return 0
+    try:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+    except FileNotFoundError:
+        print("No baseline at {0}; run with --save-baseline to store one."
+              .format(args.baseline))
+        return 0
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print("REGRESSION", regression, file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    STATUS = main()
+    # Leave lines below to see what python_ta checks.
+    # File benchmark_pyta.txt must be in same folder.
+    import python_ta
+    python_ta.check_all(config="benchmark_pyta.txt")
+    sys.exit(STATUS)
@@ -23,7 +23,7 @@ Anne Hoy's problems from the console.
 # You should have received a copy of the GNU General Public License
 # along with this file.  If not, see <http://www.gnu.org/licenses/>.
 
-from toah_model import TOAHModel, IllegalMoveError
+from toah_model import TOAHModel, TOAHRenderer, IllegalMoveError
 
 
 def move(model, origin, dest):
@@ -51,6 +51,37 @@ def move(model, origin, dest):
         print("IllegalMoveError:", e)
 
 
+def step(model, command):
+    """ Undo or redo a move in model, as command says, if possible.
+
+    @param TOAHModel model:
+    @param str command:
+        'undo' or 'redo'
+    @rtype: None
+    """
+    try:
+        if command == 'undo':
+            model.undo()
+        else:
+            model.redo()
+    except IllegalMoveError as e:
+        print("IllegalMoveError:", e)
+
+
+def go_to(model, move_number):
+    """ Undo or redo moves in model until move_number moves are in effect,
+    if possible.
+
+    @param TOAHModel model:
+    @param int move_number:
+    @rtype: None
+    """
+    try:
+        model.seek(move_number)
+    except IndexError as e:
+        print("IndexError:", e)
+
+
 class ConsoleController:
     """ Controller for text console.
     """
@@ -66,6 +97,7 @@ class ConsoleController:
 
         self.toah_model = TOAHModel(num_of_stools)
         self.toah_model.fill_first_stool(num_of_cheeses)
+        self._renderer = TOAHRenderer(self.toah_model)
 
     def process_input(self):
         """ Process Command.
@@ -84,12 +116,19 @@ class ConsoleController:
                     print('######', 'exit : Program Exit          ', '######')
                     print('######', 'quit : End Game              ', '######')
                     print('######', 'n,n  : Input number of stools', '######')
+                    print('######', 'undo : Undo Last Move        ', '######')
+                    print('######', 'redo : Redo Undone Move      ', '######')
+                    print('######', 'goto n : Go To Move n        ', '######')
                 elif command[0].strip().lower() == 'quit':
                     print('######', '###       End Game        ###', '######')
                     return False
                 elif command[0].strip().lower() == 'exit':
                     print('######', '###     Program Exit      ###', '######')
                     return False
+                elif command[0].strip().lower() in ('undo', 'redo'):
+                    step(self.toah_model, command[0].strip().lower())
+                elif command[0].strip().lower().startswith('goto'):
+                    go_to(self.toah_model, int(command[0].strip()[4:]))
                 else:
                     raise IndexError
             else:
@@ -128,7 +167,7 @@ class ConsoleController:
         print('##########', '       Start Game       ', '##########')
         print('##########', '########################', '##########', '\n')
 
-        print(self.toah_model, '\n')
+        print(self._renderer.render(), '\n')
 
         while True:
             try:
@@ -142,7 +181,7 @@ class ConsoleController:
                 print('Number is src_stool, dst_stool! ex> 0,1 ')
                 continue
             else:
-                print(self.toah_model)
+                print(self._renderer.render())
                 print('Number of moves :', \
                       self.toah_model.get_move_seq().length(), '\n')
 
@@ -25,7 +25,7 @@
 import time
 import tkinter as tk
 from gui_viewables import CheeseView, StoolView
-from toah_model import TOAHModel, IllegalMoveError
+from toah_model import CompactTOAHModel, IllegalMoveError
 
 
 class GUIController:
@@ -54,8 +54,9 @@ class GUIController:
             height in pixels for showing cheese thicknesses, and to
             scale cheese diameters
         """
-        self._model = TOAHModel(number_of_stools)
+        self._model = CompactTOAHModel(number_of_stools)
         self._stools = []
+        self._cheeses = []
         self._cheese_to_move = None
         self._blinking = False
         self._number_of_stools = number_of_stools
@@ -97,7 +98,10 @@ class GUIController:
                                 x_cent,
                                 y_cent)
             self._model.add(cheese, 0)
+            self._cheeses.append(cheese)
             total_size += self.cheese_scale
+        self.root.bind("<Control-z>", lambda event: self.step("undo"))
+        self.root.bind("<Control-y>", lambda event: self.step("redo"))
 
     def cheese_clicked(self, cheese):
         """ React to cheese being clicked: if not in the middle of blinking
@@ -207,6 +211,47 @@ class GUIController:
             self._cheese_to_move = None
             self.root.update()
 
+    def step(self, command):
+        """ Undo or redo a move, as command says, if not in the middle of
+        blinking, and show the cheeses where the model now has them.
+
+        @param GUIController self:
+        @param str command:
+            'undo' or 'redo'
+        @rtype: None
+        """
+        if self._blinking:
+            return
+        try:
+            if command == "undo":
+                self._model.undo()
+            else:
+                self._model.redo()
+        except IllegalMoveError as e:
+            print(e)
+            return
+        if self._cheese_to_move is not None:
+            self._cheese_to_move.highlight(False)
+            self._cheese_to_move = None
+        self.place_cheeses()
+        self.show_number_of_moves()
+        self.root.update()
+
+    def place_cheeses(self):
+        """ Place every cheese on the stool the model has it on.
+
+        @param GUIController self:
+        @rtype: None
+        """
+        heights = [0] * self._number_of_stools
+        # self._cheeses is largest first, so each stool fills bottom up
+        for cheese in self._cheeses:
+            stool_index = self._model.get_cheese_location(cheese)
+            heights[stool_index] += 1
+            stool = self._stools[stool_index]
+            cheese.place(stool.x_center, stool.y_center -
+                         heights[stool_index] * self.cheese_scale)
+
     def stool_index(self, stool):
         """ Return the index of stool.
 
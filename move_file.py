@@ -0,0 +1,288 @@
+"""
+A binary file format for MoveSequences.
+
+A move file is a 32-byte header followed by the packed moves:
+
+    magic       8 bytes, b'TOAHMOVE'
+    version     1 byte
+    width       1 byte, bits per stool: 4, 8 or 16
+    flags       1 byte, bit 0 set if the checksum is present
+    (padding)   1 byte
+    stools      4 bytes, number of stools
+    cheeses     4 bytes, number of cheeses
+    length      8 bytes, number of moves
+    checksum    4 bytes, CRC-32 of the packed moves, or 0
+
+All numbers are little-endian. With width 4 each move is one byte,
+source stool in the high nibble; with width 8 it is a source byte then a
+destination byte; with width 16 a source then a destination unsigned
+short. MoveFileWriter streams moves to a file, and read_moves maps a file
+into memory, so even a solution too large to fit in memory can be read
+move by move or replayed.
+"""
+
+
+# Copyright 2013, 2014, 2017 Gary Baumgartner, Danny Heap, Dustin Wehr,
+# Bogdan Simion, Jacqueline Smith, Dan Zingaro
+# Distributed under the terms of the GNU General Public License.
+#
+# This file is part of Assignment 1, CSC148, Winter 2017.
+#
+# This is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This file is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this file.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from itertools import chain
+from toah_model import MoveSequence, pack_moves
+
+
+MAGIC = b'TOAHMOVE'
+VERSION = 1
+HEADER = struct.Struct('<8sBBBxIIQI')
+_CHECKSUM = 1
+# Moves are buffered and written this many at a time.
+_CHUNK_MOVES = 1 << 16
+
+
+def move_width(number_of_stools):
+    """ Return the fewest bits per stool, 4, 8 or 16, that hold every stool
+    of number_of_stools.
+
+    @type number_of_stools: int
+    @rtype: int
+
+    >>> move_width(4), move_width(17), move_width(300)
+    (4, 8, 16)
+    """
+    for width in (4, 8, 16):
+        if number_of_stools <= 1 << width:
+            return width
+    raise ValueError("Too many stools for a move file.")
+
+
+class MoveFileWriter:
+    """ Writes moves to a move file as they are made.
+
+    Use as a context manager, or call close() when done: the header,
+    with the number of moves and the checksum, is only written then, and
+    not if a move could not be written or the with block raised.
+
+    === Attributes ===
+    @param int number_of_stools: stools the moves are made on
+    @param int number_of_cheeses: cheeses the moves are made with
+    """
+
+    def __init__(self, path, number_of_stools, number_of_cheeses,
+                 checksum=True):
+        """ Create a new MoveFileWriter self, writing to the file at path.
+
+        @type self: MoveFileWriter
+        @type path: str
+        @type number_of_stools: int
+        @type number_of_cheeses: int
+        @type checksum: bool
+            whether to store a checksum of the moves
+        @rtype: None
+        """
+        self.number_of_stools = number_of_stools
+        self.number_of_cheeses = number_of_cheeses
+        self._width = move_width(number_of_stools)
+        self._checksum = 0 if checksum else None
+        self._length = 0
+        self._pending = []
+        self._file = open(path, 'wb')
+        self._file.write(bytes(HEADER.size))
+
+    def __enter__(self):
+        """ Return self, to write moves to.
+
+        @type self: MoveFileWriter
+        @rtype: MoveFileWriter
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ Close self, or, if the with block raised an exception, close
+        the file without its header, so it is not read as a move file.
+
+        @type self: MoveFileWriter
+        @type exc_type: type | None
+        @type exc_value: BaseException | None
+        @type traceback: traceback | None
+        @rtype: None
+
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'moves.toah')
+        >>> with MoveFileWriter(path, 3, 2) as writer:
+        ...     writer.add_moves([(0, 1), (0, 3)])
+        Traceback (most recent call last):
+        ...
+        ValueError: Move to or from a stool that does not exist.
+        >>> read_moves(path)  # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+        ...
+        ValueError: ... is not a move file.
+        """
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def add_move(self, src_stool, dest_stool):
+        """ Write the move from src_stool to dest_stool.
+
+        @type self: MoveFileWriter
+        @type src_stool: int
+        @type dest_stool: int
+        @rtype: None
+        """
+        self._pending.append((src_stool, dest_stool))
+        if len(self._pending) >= _CHUNK_MOVES:
+            self._flush()
+
+    def add_moves(self, moves):
+        """ Write every (src_stool, dest_stool) move in moves, in order.
+
+        @type self: MoveFileWriter
+        @type moves: iterable[tuple[int]]
+        @rtype: None
+        """
+        for move in moves:
+            self._pending.append(move)
+            if len(self._pending) >= _CHUNK_MOVES:
+                self._flush()
+
+    def _flush(self):
+        """ Write the moves waiting in self's buffer.
+
+        @type self: MoveFileWriter
+        @rtype: None
+        """
+        moves = self._pending
+        self._pending = []
+        flat_moves = list(chain.from_iterable(moves))
+        if not flat_moves:
+            return
+        if min(flat_moves) < 0 or max(flat_moves) >= self.number_of_stools:
+            # moves were lost, so the file is left without its header
+            self._file.close()
+            raise ValueError("Move to or from a stool that does not exist.")
+        packed = pack_moves(moves, flat_moves, self._width)
+        if self._width == 16 and sys.byteorder == 'big':
+            packed.byteswap()
+        data = packed.tobytes()
+        if self._checksum is not None:
+            self._checksum = zlib.crc32(data, self._checksum)
+        self._file.write(data)
+        self._length += len(moves)
+
+    def close(self):
+        """ Write the moves still buffered and the header, and close the
+        file.
+
+        @type self: MoveFileWriter
+        @rtype: None
+        """
+        if self._file.closed:
+            return
+        try:
+            self._flush()
+            self._file.seek(0)
+            self._file.write(HEADER.pack(
+                MAGIC, VERSION, self._width,
+                0 if self._checksum is None else _CHECKSUM,
+                self.number_of_stools, self.number_of_cheeses,
+                self._length, self._checksum or 0))
+        finally:
+            self._file.close()
+
+
+def write_moves(path, move_seq, number_of_stools, number_of_cheeses,
+                checksum=True):
+    """ Write move_seq, made on number_of_stools stools with
+    number_of_cheeses cheeses, to a move file at path.
+
+    @type path: str
+    @type move_seq: MoveSequence
+    @type number_of_stools: int
+    @type number_of_cheeses: int
+    @type checksum: bool
+        whether to store a checksum of the moves
+    @rtype: None
+    """
+    with MoveFileWriter(path, number_of_stools, number_of_cheeses,
+                        checksum) as writer:
+        writer.add_moves(move_seq)
+
+
+def read_moves(path, verify=False):
+    """ Return the number of stools, the number of cheeses and the moves
+    in the move file at path. The moves are read from the file as they
+    are used, not loaded up front; checking them against the checksum,
+    if verify is True, reads them all.
+
+    Raise ValueError if the file is not a move file, is cut short, or
+    fails verification.
+
+    @type path: str
+    @type verify: bool
+    @rtype: tuple[int, int, MoveSequence]
+
+    >>> import os, tempfile
+    >>> from tour import iter_tour_moves, get_tour_model
+    >>> path = os.path.join(tempfile.mkdtemp(), 'tour.toah')
+    >>> with MoveFileWriter(path, 4, 10) as writer:
+    ...     writer.add_moves(iter_tour_moves(10, [0, 3, 1, 2]))
+    >>> (stools, cheeses, move_seq) = read_moves(path, verify=True)
+    >>> (stools, cheeses, move_seq.length(), move_seq.get_move(-1))
+    (4, 10, 49, (1, 3))
+    >>> move_seq.generate_toah_model(stools, cheeses) == get_tour_model(10, 49)
+    True
+    """
+    with open(path, 'rb') as move_file:
+        try:
+            mapped = mmap.mmap(move_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError("{0} is not a move file.".format(path))
+    if len(mapped) < HEADER.size:
+        raise ValueError("{0} is not a move file.".format(path))
+    (magic, version, width, flags, number_of_stools, number_of_cheeses,
+     length, checksum) = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION or width not in (4, 8, 16):
+        raise ValueError("{0} is not a move file.".format(path))
+    size = length * (1 if width == 4 else width // 4)
+    if len(mapped) < HEADER.size + size:
+        raise ValueError("{0} is cut short.".format(path))
+    moves = memoryview(mapped)[HEADER.size:HEADER.size + size]
+    if verify and flags & _CHECKSUM and zlib.crc32(moves) != checksum:
+        raise ValueError("{0} fails its checksum.".format(path))
+    if width == 16 and sys.byteorder == 'big':
+        # stored little-endian, so the moves must be copied and swapped
+        moves = array('H', moves.cast('H'))
+        moves.byteswap()
+    return (number_of_stools, number_of_cheeses,
+            MoveSequence.from_buffer(moves, width))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
+    # Leave lines below to see what python_ta checks.
+    # File movefile_pyta.txt must be in same folder.
+    import python_ta
+    python_ta.check_all(config="movefile_pyta.txt")
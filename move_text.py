@@ -0,0 +1,189 @@
+"""
+Check text files of moves, one src,dst per line, as they are read.
+
+This is the format ConsoleController.process_input reads a move in: two
+stool numbers separated by a comma, with spaces or tabs allowed around
+either. Blank lines are skipped. A file is read in blocks of BLOCK_BYTES,
+each block is matched against the format and split into stool numbers by
+a few calls over the whole block, and its moves are checked with a
+MoveChecker, so memory use does not grow with the length of the file.
+"""
+
+
+# Copyright 2013, 2014, 2017 Gary Baumgartner, Danny Heap, Dustin Wehr,
+# Bogdan Simion, Jacqueline Smith, Dan Zingaro
+# Distributed under the terms of the GNU General Public License.
+#
+# This file is part of Assignment 1, CSC148, Winter 2017.
+#
+# This is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This file is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this file.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import re
+from array import array
+from move_check import MoveChecker
+from toah_model import MoveSequence
+
+# Bytes read from a file at a time by default.
+BLOCK_BYTES = 1 << 20
+# A line that is neither a move nor blank.
+_NOT_MOVE = re.compile(
+    br'(?m)^(?![ \t]*(?:\d+[ \t]*,[ \t]*\d+[ \t]*)?\r?$).*')
+
+
+def check_move_text(path, number_of_stools, number_of_cheeses,
+                    block_bytes=BLOCK_BYTES):
+    """ Return the line number, counting from 1, of the first move in the
+    text file at path that is illegal when the game starts with
+    number_of_cheeses on the first of number_of_stools stools, or None if
+    every move is legal, and the location of each cheese, by size - 1,
+    after the moves before it.
+
+    Raise ValueError, with its line number, if a line before the first
+    illegal move is not a move.
+
+    @type path: str
+    @type number_of_stools: int
+    @type number_of_cheeses: int
+    @type block_bytes: int
+        bytes read at a time; no line may be longer
+    @rtype: tuple[int | None, list[int]]
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'moves.txt')
+    >>> with open(path, 'w') as move_file:
+    ...     _ = move_file.write('0,1\\n\\n 0 , 2\\n1,2\\n0,1')
+    >>> check_move_text(path, 3, 2)
+    (5, [2, 2])
+    >>> check_move_text(path, 3, 1)
+    (3, [1])
+    >>> with open(path, 'a') as move_file:
+    ...     _ = move_file.write('\\n1;0\\n')
+    >>> check_move_text(path, 3, 3)
+    Traceback (most recent call last):
+    ...
+    ValueError: Line 6 is not a move: b'1;0'
+    >>> with open(path, 'w') as move_file:
+    ...     _ = move_file.write('0,1\\n0,1\\nx\\n')
+    >>> check_move_text(path, 3, 2), check_move_text(path, 3, 2, block_bytes=4)
+    ((2, [1, 0]), (2, [1, 0]))
+    """
+    checker = MoveChecker(number_of_stools, number_of_cheeses)
+    number_of_lines = 0
+    rest = b''
+    with open(path, 'rb') as move_file:
+        while True:
+            data = move_file.read(block_bytes)
+            end = data.rfind(b'\n') + 1 if data else len(rest)
+            if not data and not rest:
+                break
+            if not end:
+                rest = _carry_line(rest, data, number_of_lines + 1,
+                                   block_bytes)
+                continue
+            (block, rest) = (rest + data[:end], data[end:])
+            if not data:
+                block += b'\n'
+            line = _check_block(checker, block, number_of_lines + 1)
+            if line is not None:
+                return (line, checker.get_locations())
+            number_of_lines += block.count(b'\n')
+    return (None, checker.get_locations())
+
+
+def _check_block(checker, block, first_line):
+    """ Check the moves on the whole lines of block, which start at line
+    number first_line, with checker, and return the line number of the
+    first illegal one, or None if they are all legal.
+
+    Raise ValueError if a line before the first illegal move is not a
+    move.
+
+    @type checker: MoveChecker
+    @type block: bytes
+    @type first_line: int
+    @rtype: int | None
+    """
+    not_move = _NOT_MOVE.search(block)
+    if not_move is not None:
+        # an illegal move before the line comes first, wherever the
+        # blocks happen to split
+        line = _check_block(checker, block[:not_move.start()], first_line)
+        if line is not None:
+            return line
+        raise ValueError("Line {0} is not a move: {1!r}".format(
+            first_line + block.count(b'\n', 0, not_move.start()),
+            not_move.group().rstrip(b'\r')))
+    flat_moves = list(map(int, block.replace(b',', b' ').split()))
+    index = checker.check(_move_seq_of(flat_moves))
+    if index is None:
+        return None
+    if len(flat_moves) == 2 * block.count(b'\n'):
+        # no blank lines, so move i is on line i of the block
+        return first_line + index
+    for (line, text) in enumerate(block.split(b'\n'), first_line):
+        if text.strip():
+            if not index:
+                return line
+            index -= 1
+    return None
+
+
+def _carry_line(rest, data, line, block_bytes):
+    """ Return rest, the start of line number line, carried on by data, a
+    block read with no newline in it.
+
+    Raise ValueError if rest is already longer than block_bytes, as no
+    move is.
+
+    @type rest: bytes
+    @type data: bytes
+    @type line: int
+    @type block_bytes: int
+    @rtype: bytes
+
+    >>> _carry_line(b'0,', b'1', 3, 4)
+    b'0,1'
+    """
+    if len(rest) > block_bytes:
+        raise ValueError("Line {0} is not a move.".format(line))
+    return rest + data
+
+
+def _move_seq_of(flat_moves):
+    """ Return a MoveSequence of the moves whose stools, source then
+    destination, are flat_moves, packed if the stools are small enough.
+
+    @type flat_moves: list[int]
+    @rtype: MoveSequence
+
+    >>> list(_move_seq_of([0, 1, 300, 2])), list(_move_seq_of([7, 1 << 20]))
+    ([(0, 1), (300, 2)], [(7, 1048576)])
+    """
+    largest = max(flat_moves, default=0)
+    for (typecode, width) in (('B', 8), ('H', 16)):
+        if largest < 1 << width:
+            packed = array(typecode, flat_moves)
+            return MoveSequence.from_buffer(memoryview(packed).cast('B'),
+                                            width)
+    return MoveSequence(list(zip(flat_moves[::2], flat_moves[1::2])))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
+    # Leave lines below to see what python_ta checks.
+    # File movetext_pyta.txt must be in same folder.
+    import python_ta
+    python_ta.check_all(config="movetext_pyta.txt")
@@ -0,0 +1,167 @@
+"""
+functions to generate large TOAH tours on a pool of processes.
+
+A tour splits into independent sub-tours (move n-i cheeses aside, move i
+cheeses, move the n-i back) whose lengths are known from the Frame-Stewart
+table, so every sub-tour's moves have a known offset in the whole tour.
+Worker processes generate sub-tours and write them straight into a shared
+buffer at those offsets, two bytes (source stool, destination stool) per
+move.
+"""
+
+
+# Copyright 2013, 2014, 2017 Gary Baumgartner, Danny Heap, Dustin Wehr,
+# Bogdan Simion, Jacqueline Smith, Dan Zingaro
+# Distributed under the terms of the GNU General Public License.
+#
+# This file is part of Assignment 1, CSC148, Winter 2017.
+#
+# This is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This file is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this file.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import multiprocessing
+from tour import (iter_tour_blocks, iter_tour_moves, min_number_of_moves,
+                  _tour_parts, _tour_stools)
+
+# Sub-tours shorter than this are never handed to a worker on their own.
+MIN_TASK_MOVES = 1 << 16
+
+# The shared move buffer, set in each worker by _init_worker.
+_BUFFER = None
+
+
+def _init_worker(buffer):
+    """ Keep the shared move buffer for this worker process.
+
+    @type buffer: multiprocessing.RawArray
+    @rtype: None
+    """
+    global _BUFFER
+    _BUFFER = memoryview(buffer).cast('B')
+
+
+def _write_moves(task):
+    """ Generate the sub-tour in task and write its moves into the shared
+    buffer at the task's offset. Return the number of moves written.
+
+    @type task: tuple[int, int, tuple[int]]
+        (offset in moves, number of cheeses, stools) of a sub-tour
+    @rtype: int
+    """
+    (offset, n, stool) = task
+    moves = b"".join(iter_tour_blocks(n, stool))
+    _BUFFER[2 * offset:2 * offset + len(moves)] = moves
+    return len(moves) // 2
+
+
+def split_tour(n, stool, max_moves):
+    """
+    Return the sub-tours, as (offset, n, stools) in solution order, that
+    make up the tour of n cheeses from stool[0] to stool[1], splitting
+    until each has at most max_moves moves or is a single move.
+
+    @type n: int
+    @type stool: list[int]
+    @type max_moves: int
+    @rtype: list[tuple[int, int, tuple[int]]]
+
+    >>> [(offset, n) for (offset, n, stool) in split_tour(5, [0, 3, 1, 2], 5)]
+    [(0, 3), (5, 2), (8, 3)]
+    """
+    tasks = []
+    pending = [(n, tuple(stool))]
+    offset = 0
+    while pending:
+        (n, stool) = pending.pop()
+        moves = min_number_of_moves(n, len(stool))
+        if moves == 0:
+            continue
+        elif moves <= max_moves or n == 1:
+            tasks.append((offset, n, stool))
+            offset += moves
+        else:
+            for (part_n, _, part_stools) in reversed(_tour_parts(
+                    n, len(stool))):
+                pending.append((part_n, tuple([stool[s]
+                                               for s in part_stools])))
+    return tasks
+
+
+def parallel_tour_moves(n, number_of_stools=4, processes=None):
+    """
+    Return the tour of n cheeses from the first of number_of_stools stools
+    to the last, generated on a pool of processes, as a memoryview of the
+    shared buffer holding the source and destination stool of each move in
+    turn.
+
+    @type n: int
+    @type number_of_stools: int
+    @type processes: int | None
+        number of worker processes, or None for one per CPU
+    @rtype: memoryview
+
+    >>> moves = parallel_tour_moves(6, processes=2)
+    >>> list(zip(moves[0::2], moves[1::2])) == \
+list(iter_tour_moves(6, [0, 3, 1, 2]))
+    True
+    """
+    if number_of_stools > 256:
+        raise ValueError("Stools must fit in one byte.")
+    total = min_number_of_moves(n, number_of_stools)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    buffer = multiprocessing.RawArray('B', 2 * total)
+    # several tasks per process, so uneven sub-tours even out
+    tasks = split_tour(n, _tour_stools(number_of_stools),
+                       max(total // (8 * processes), MIN_TASK_MOVES))
+    with multiprocessing.Pool(processes, _init_worker, (buffer,)) as pool:
+        written = sum(pool.imap_unordered(_write_moves, tasks))
+    if written != total:
+        raise RuntimeError("Wrote {0} of the {1} moves of the tour.".format(
+            written, total))
+    return memoryview(buffer).cast('B')
+
+
+def parallel_tour(model, processes=None):
+    """
+    Move the tower of cheeses from the first stool in model to the last,
+    generating the moves on a pool of processes, and return the number of
+    moves made.
+
+    @type model: TOAHModel
+        TOAHModel with tower of cheese on first stool and the other
+        stools empty
+    @type processes: int | None
+        number of worker processes, or None for one per CPU
+    @rtype: int
+
+    >>> from toah_model import TOAHModel
+    >>> model = TOAHModel(4)
+    >>> model.fill_first_stool(8)
+    >>> parallel_tour(model, processes=2)
+    33
+    """
+    moves = parallel_tour_moves(model.get_number_of_cheeses(),
+                                model.get_number_of_stools(), processes)
+    model.apply_trusted_moves(zip(moves[0::2], moves[1::2]))
+    return len(moves) // 2
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
+    # Leave lines below to see what python_ta checks.
+    # File paralleltour_pyta.txt must be in same folder.
+    import python_ta
+    python_ta.check_all(config="paralleltour_pyta.txt")
@@ -0,0 +1,267 @@
+"""
+Look up the state of a game at any move of a MoveSequence.
+
+MoveSequence.generate_toah_model replays every move from the start, so
+asking for the state at many different moves of a long sequence replays
+it again and again. A ReplayIndex instead keeps snapshots of where each
+cheese is every so many moves, and the state at its latest query, and
+answers each query by replaying only from the nearest of them.
+"""
+
+
+# Copyright 2013, 2014, 2017 Gary Baumgartner, Danny Heap, Dustin Wehr,
+# Bogdan Simion, Jacqueline Smith, Dan Zingaro
+# Distributed under the terms of the GNU General Public License.
+#
+# This file is part of Assignment 1, CSC148, Winter 2017.
+#
+# This is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This file is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this file.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from array import array
+from collections import OrderedDict
+from toah_model import TOAHModel, IllegalMoveError
+
+# Moves between snapshots, and the most snapshots kept, by default.
+SNAPSHOT_INTERVAL = 1 << 12
+MAX_SNAPSHOTS = 256
+
+
+class ReplayIndex:
+    """ The states of a game as the moves of a MoveSequence are made,
+    starting with every cheese on the first stool.
+
+    A snapshot of the location of each cheese is taken whenever a replay
+    passes a multiple of interval moves, so once the moves up to i have
+    been replayed, finding the state at i replays fewer than interval
+    moves: forwards from the snapshot before it, backwards from the one
+    after it, or from the state at the latest query if that is nearer.
+    Only the max_snapshots most recently used snapshots are kept, each
+    taking number_of_cheeses bytes (twice that with more than 256
+    stools), and a query whose snapshot was dropped replays from an
+    earlier one: a smaller interval makes queries faster, and more
+    snapshots keep more of them fast.
+
+    === Attributes ===
+    @param MoveSequence move_seq: moves being replayed
+    @param int number_of_stools: stools the moves are made on
+    @param int number_of_cheeses: cheeses the moves are made with
+    @param int interval: moves between snapshots
+    @param int|None max_snapshots: most snapshots kept, or None for no
+        limit
+    """
+
+    def __init__(self, move_seq, number_of_stools, number_of_cheeses,
+                 interval=SNAPSHOT_INTERVAL, max_snapshots=MAX_SNAPSHOTS):
+        """ Create a new ReplayIndex self over move_seq.
+
+        @type self: ReplayIndex
+        @type move_seq: MoveSequence
+        @type number_of_stools: int
+        @type number_of_cheeses: int
+        @type interval: int
+        @type max_snapshots: int | None
+        @rtype: None
+        """
+        if interval < 1:
+            raise ValueError("The snapshot interval must be positive.")
+        self.move_seq = move_seq
+        self.number_of_stools = number_of_stools
+        self.number_of_cheeses = number_of_cheeses
+        self.interval = interval
+        self.max_snapshots = max_snapshots
+        self._typecode = 'B' if number_of_stools <= 256 else 'H'
+        # snapshot number k is the state after k * interval moves
+        self._snapshots = OrderedDict()
+        self._position = 0
+        self._stacks = self._unpack(None)
+
+    def number_of_snapshots(self):
+        """ Return the number of snapshots self keeps.
+
+        @type self: ReplayIndex
+        @rtype: int
+        """
+        return len(self._snapshots)
+
+    def locations_at(self, move_number):
+        """ Return the index of the stool each cheese is on after the
+        first move_number moves, where the cheese of size s is at
+        position s - 1.
+
+        Raise IndexError if move_seq does not have move_number moves, and
+        IllegalMoveError if one of them is illegal.
+
+        @type self: ReplayIndex
+        @type move_number: int
+        @rtype: list[int]
+
+        >>> from toah_model import MoveSequence
+        >>> ms = MoveSequence([(0, 1), (0, 2), (1, 2)])
+        >>> index = ReplayIndex(ms, 3, 2, interval=2)
+        >>> index.locations_at(3), index.locations_at(1)
+        ([2, 2], [1, 0])
+        >>> index.number_of_snapshots()
+        1
+        >>> ReplayIndex(MoveSequence([(0, 1), (0, 1)]), 3, 2).locations_at(2)
+        Traceback (most recent call last):
+        ...
+        toah_model.IllegalMoveError: Move 1 is illegal.
+        """
+        self._go_to(move_number)
+        locations = [0] * self.number_of_cheeses
+        for (stool_index, stack) in enumerate(self._stacks):
+            for cheese_size in stack:
+                locations[cheese_size - 1] = stool_index
+        return locations
+
+    def state_at(self, move_number):
+        """ Return a new TOAHModel in the state after the first move_number
+        moves. The model has made no moves itself.
+
+        Raise IndexError if move_seq does not have move_number moves, and
+        IllegalMoveError if one of them is illegal.
+
+        @type self: ReplayIndex
+        @type move_number: int
+        @rtype: TOAHModel
+
+        >>> from tour import iter_tour_moves
+        >>> from toah_model import MoveSequence
+        >>> ms = MoveSequence(iter_tour_moves(10, [0, 3, 1, 2]))
+        >>> index = ReplayIndex(ms, 4, 10, interval=8, max_snapshots=2)
+        >>> all(index.state_at(i) == ms[:i].generate_toah_model(4, 10)
+        ...     for i in (49, 3, 20, 17, 40, 0, 33))
+        True
+        >>> index.number_of_snapshots()
+        2
+        """
+        model = TOAHModel(self.number_of_stools)
+        model.fill_stools(self.locations_at(move_number))
+        return model
+
+    def _go_to(self, move_number):
+        """ Bring self's state to the one after the first move_number
+        moves, from the nearest snapshot or from where it is.
+
+        @type self: ReplayIndex
+        @type move_number: int
+        @rtype: None
+        """
+        if not 0 <= move_number <= self.move_seq.length():
+            raise IndexError("There is no move {0}.".format(move_number))
+        interval = self.interval
+        below = move_number // interval
+        while below > 0 and below not in self._snapshots:
+            below -= 1
+        above = -(-move_number // interval)
+        (distance, snapshot) = (abs(self._position - move_number), None)
+        if move_number - below * interval < distance:
+            (distance, snapshot) = (move_number - below * interval, below)
+        if (above in self._snapshots and
+                above * interval - move_number < distance):
+            snapshot = above
+        if snapshot is not None:
+            self._stacks = self._unpack(snapshot)
+            self._position = snapshot * interval
+        if self._position < move_number:
+            self._forward(move_number)
+        elif self._position > move_number:
+            self._backward(move_number)
+
+    def _forward(self, move_number):
+        """ Make the moves from self's state up to move_number, taking
+        snapshots as it passes them.
+
+        @type self: ReplayIndex
+        @type move_number: int
+        @rtype: None
+        """
+        while self._position < move_number:
+            position = self._position
+            end = min(move_number, (position // self.interval + 1) *
+                      self.interval)
+            index = self.move_seq[position:end].replay_on_stacks(
+                self._stacks)
+            if index is not None:
+                # the state is the one before the illegal move
+                self._position = position + index
+                raise IllegalMoveError(
+                    "Move {0} is illegal.".format(self._position))
+            self._position = end
+            if end % self.interval == 0:
+                self._keep(end // self.interval)
+
+    def _backward(self, move_number):
+        """ Take back the moves from self's state down to move_number. They
+        have all been made before, so they are legal.
+
+        @type self: ReplayIndex
+        @type move_number: int
+        @rtype: None
+        """
+        stacks = self._stacks
+        for (src_stool, dest_stool) in reversed(
+                list(self.move_seq[move_number:self._position])):
+            stacks[src_stool].append(stacks[dest_stool].pop())
+        self._position = move_number
+
+    def _keep(self, snapshot):
+        """ Keep self's state as the most recently used snapshot, forgetting
+        the least recently used one if there are too many.
+
+        @type self: ReplayIndex
+        @type snapshot: int
+        @rtype: None
+        """
+        if snapshot in self._snapshots:
+            self._snapshots.move_to_end(snapshot)
+            return
+        locations = array(self._typecode, [0]) * self.number_of_cheeses
+        for (stool_index, stack) in enumerate(self._stacks):
+            for cheese_size in stack:
+                locations[cheese_size - 1] = stool_index
+        self._snapshots[snapshot] = locations
+        if (self.max_snapshots is not None and
+                len(self._snapshots) > self.max_snapshots):
+            self._snapshots.popitem(last=False)
+
+    def _unpack(self, snapshot):
+        """ Return stacks of cheese sizes, bottom first, in snapshot, or at
+        the start if snapshot is None or 0, marking snapshot as the most
+        recently used.
+
+        @type self: ReplayIndex
+        @type snapshot: int | None
+        @rtype: list[list[int]]
+        """
+        stacks = [[] for _ in range(self.number_of_stools)]
+        if not snapshot:
+            if self.number_of_stools > 0:
+                stacks[0] = list(range(self.number_of_cheeses, 0, -1))
+            return stacks
+        self._snapshots.move_to_end(snapshot)
+        locations = self._snapshots[snapshot]
+        for cheese_size in range(self.number_of_cheeses, 0, -1):
+            stacks[locations[cheese_size - 1]].append(cheese_size)
+        return stacks
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
+    # Leave lines below to see what python_ta checks.
+    # File replayindex_pyta.txt must be in same folder.
+    import python_ta
+    python_ta.check_all(config="replayindex_pyta.txt")
@@ -2,10 +2,13 @@
 TOAHModel:  Model a game of Tour of Anne Hoy
 Cheese:   Model a cheese with a given (relative) size
 IllegalMoveError: Type of exceptions thrown when an illegal move is attempted
+TOAHRenderer: Render a TOAHModel as text, redrawing only what changed
 MoveSequence: Record of a sequence of (not necessarily legal) moves. You will
 need to return MoveSequence object after solving an instance of the 4-stool
 Tour of Anne Hoy game, and we will use that to check the correctness of your
 algorithm.
+GrammarMoveSequence: A MoveSequence stored as rules that reuse sub-sequences
+on other stools, for repetitive solutions such as tours
 """
 
 
@@ -30,6 +33,51 @@ algorithm.
 #
 
 
+import hashlib
+import sys
+from array import array
+from bisect import bisect_right
+from copy import copy
+from itertools import chain
+
+# A TOAHModel records its cheese locations every this many moves (or
+# every number of cheeses moves, if more), to seek from
+_CHECKPOINT_INTERVAL = 1 << 12
+
+# Zobrist keys are 64-bit, and kept as made in an array for each stool,
+# indexed by cheese size
+_MASK64 = (1 << 64) - 1
+_ZOBRIST_KEYS = []
+
+
+def _zobrist_key(cheese_size, stool_index):
+    """ Return the Zobrist key of a cheese of cheese_size on stool_index:
+    a fixed 64-bit pseudo-random number, from the splitmix64 finalizer.
+    Keys are kept in _ZOBRIST_KEYS for quick lookup.
+
+    @param int cheese_size:
+    @param int stool_index:
+    @rtype: int
+
+    >>> _zobrist_key(1, 0) == _ZOBRIST_KEYS[0][1] != _zobrist_key(1, 1)
+    True
+    """
+    try:
+        return _ZOBRIST_KEYS[stool_index][cheese_size]
+    except IndexError:
+        pass
+    while len(_ZOBRIST_KEYS) <= stool_index:
+        _ZOBRIST_KEYS.append(array('Q'))
+    keys = _ZOBRIST_KEYS[stool_index]
+    for size in range(len(keys), cheese_size + 1):
+        key = (size * 0x9E3779B97F4A7C15 +
+               stool_index * 0xD1B54A32D192ED03) & _MASK64
+        key = ((key ^ (key >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        key = ((key ^ (key >> 27)) * 0x94D049BB133111EB) & _MASK64
+        keys.append(key ^ (key >> 31))
+    return keys[cheese_size]
+
+
 class TOAHModel:
     """ Model a game of Tour Of Anne Hoy.
 
@@ -63,6 +111,23 @@ class TOAHModel:
         # you must have _move_seq as well as any other attributes you choose
         self._move_seq = MoveSequence([])
 
+        # Zobrist hash of the configuration: the xor of the keys of each
+        # cheese on its stool, or None until zobrist_hash next computes it;
+        # moves only keep it up to date once it has been asked for
+        self._hash = None
+
+        # number of moves at the end of _move_seq that have been undone,
+        # and can be redone
+        self._undone = 0
+        # count of the times moves in effect were taken back, by undo,
+        # seek or dropping undone moves
+        self._history = 0
+        # sizes on each stool after every _checkpoint_interval moves, set
+        # on the first checkpoint, and moves left until the next one
+        self._checkpoints = []
+        self._checkpoint_interval = 0
+        self._until_checkpoint = 0
+
     def fill_first_stool(self, number_of_cheeses):
         """ Add number_of_cheeses to the first stool.
 
@@ -78,6 +143,29 @@ class TOAHModel:
 
         self._number_of_cheeses = number_of_cheeses
 
+    def fill_stools(self, locations):
+        """ Add a cheese of size s to stool locations[s - 1] for every
+        size s from len(locations) down to 1.
+
+        @param TOAHModel self:
+        @param list[int] locations:
+        @rtype: None
+
+        >>> M = TOAHModel(3)
+        >>> M.fill_stools([2, 0, 2])
+        >>> M.get_top_cheese(2).size
+        1
+        >>> M.get_number_of_cheeses()
+        3
+        """
+        if self.get_number_of_cheeses() > 0:
+            raise IllegalMoveError("Has already been filled")
+
+        for cheese_size in range(len(locations), 0, -1):
+            self.add(Cheese(cheese_size), locations[cheese_size - 1])
+
+        self._number_of_cheeses = len(locations)
+
     def get_number_of_stools(self):
         """ Return the number_of_stools in the TOAHModel.
 
@@ -95,15 +183,16 @@ class TOAHModel:
         return self._number_of_cheeses
 
     def number_of_moves(self):
-        """ Return the total number of moves in self._move_seq.
+        """ Return the total number of moves in self._move_seq, less those
+        undone.
 
         @param TOAHModel self:
         @rtype: int
         """
-        return self._move_seq.length()
+        return self._move_seq.length() - self._undone
 
     def get_move_seq(self):
-        """ Return the move sequence.
+        """ Return the move sequence, without any moves undone.
 
         @param TOAHModel self:
         @rtype: MoveSequence
@@ -112,6 +201,8 @@ class TOAHModel:
         >>> toah.get_move_seq() == MoveSequence([])
         True
         """
+        if self._undone:
+            return self._move_seq[:self.number_of_moves()]
         return self._move_seq
 
     def __eq__(self, other):
@@ -140,7 +231,85 @@ class TOAHModel:
         >>> m1 == m2
         True
         """
-        return isinstance(other, TOAHModel) and self._stools == other._stools
+        return (isinstance(other, TOAHModel) and
+                self.zobrist_hash() == other.zobrist_hash() and
+                self._stools == other._stools)
+
+    def __hash__(self):
+        """ Return a hash of TOAHModel self's configuration, so that
+        equivalent TOAHModels hash the same. A TOAHModel used as a
+        dictionary key must not be changed while it is one.
+
+        @type self: TOAHModel
+        @rtype: int
+
+        >>> m1 = TOAHModel(3)
+        >>> m1.fill_first_stool(2)
+        >>> m2 = TOAHModel(3)
+        >>> m2.fill_stools([0, 0])
+        >>> len({m1, m2})
+        1
+        """
+        return hash(self.zobrist_hash())
+
+    def zobrist_hash(self):
+        """ Return the 64-bit Zobrist hash of TOAHModel self's
+        configuration: the xor of a fixed pseudo-random key for each
+        cheese size and the stool it is on. It is computed on the first
+        call, and from then on adding, removing and moving a cheese update
+        it in O(1).
+
+        @type self: TOAHModel
+        @rtype: int
+
+        >>> M = TOAHModel(3)
+        >>> M.fill_first_stool(2)
+        >>> M.zobrist_hash() == _zobrist_key(1, 0) ^ _zobrist_key(2, 0)
+        True
+        """
+        if self._hash is None:
+            self._hash = 0
+            for (stool_index, sizes) in enumerate(self._stool_sizes()):
+                for cheese_size in sizes:
+                    self._hash ^= _zobrist_key(cheese_size, stool_index)
+        return self._hash
+
+    def state_key(self, symmetric=False):
+        """ Return a compact key for TOAHModel self's configuration: the
+        stool of each cheese, by size, packed into bytes. Two TOAHModels
+        with the same number of cheeses have the same key exactly when
+        they are equivalent.
+
+        If symmetric is True, the stools other than the first and last,
+        which are interchangeable in a tour, are renumbered in the order
+        the largest cheeses first reach them, so configurations that only
+        differ by swapping those stools have the same key.
+
+        @type self: TOAHModel
+        @type symmetric: bool
+        @rtype: bytes
+
+        >>> m1 = TOAHModel(4)
+        >>> m1.fill_stools([1, 0, 3])
+        >>> m2 = TOAHModel(4)
+        >>> m2.fill_stools([2, 0, 3])
+        >>> m1.state_key() == m2.state_key()
+        False
+        >>> m1.state_key(True) == m2.state_key(True)
+        True
+        """
+        locations = self.get_cheese_locations()
+        if symmetric:
+            last = self.get_number_of_stools() - 1
+            spares = {}
+            for cheese_size in range(len(locations), 0, -1):
+                stool_index = locations[cheese_size - 1]
+                if 0 < stool_index < last:
+                    locations[cheese_size - 1] = spares.setdefault(
+                        stool_index, len(spares) + 1)
+        if self.get_number_of_stools() <= 256:
+            return bytes(locations)
+        return array('L', locations).tobytes()
 
     def __str__(self):
         """
@@ -149,13 +318,9 @@ class TOAHModel:
         @param TOAHModel self:
         @rtype: str
         """
-        all_cheeses = []
-        for height in range(self.get_number_of_cheeses()):
-            for stool in range(self.get_number_of_stools()):
-                if self._cheese_at(stool, height) is not None:
-                    all_cheeses.append(self._cheese_at(stool, height))
-        max_cheese_size = max([c.size for c in all_cheeses]) \
-            if len(all_cheeses) > 0 else 0
+        stool_sizes = self._stool_sizes()
+        all_sizes = [size for sizes in stool_sizes for size in sizes]
+        max_cheese_size = max(all_sizes) if len(all_sizes) > 0 else 0
         stool_str = "=" * (2 * max_cheese_size + 1)
         stool_spacing = "  "
         stools_str = (stool_str + stool_spacing) * self.get_number_of_stools()
@@ -171,10 +336,9 @@ class TOAHModel:
         lines = ""
         for height in range(self.get_number_of_cheeses() - 1, -1, -1):
             line = ""
-            for stool in range(self.get_number_of_stools()):
-                c = self._cheese_at(stool, height)
-                if isinstance(c, Cheese):
-                    s = _cheese_str(int(c.size))
+            for sizes in stool_sizes:
+                if height < len(sizes):
+                    s = _cheese_str(int(sizes[height]))
                 else:
                     s = _cheese_str(0)
                 line += s + stool_spacing
@@ -183,6 +347,19 @@ class TOAHModel:
 
         return lines
 
+    def _stool_sizes(self):
+        """ Return the sizes of the cheeses on each stool, bottom first.
+
+        @type self: TOAHModel
+        @rtype: list[list[int]]
+
+        >>> M = TOAHModel(3)
+        >>> M.fill_first_stool(2)
+        >>> M._stool_sizes()
+        [[2, 1], [], []]
+        """
+        return [[cheese.size for cheese in stool] for stool in self._stools]
+
     def _cheese_at(self, stool_index, stool_height):
         """ Return (stool_height)th from stool_index stool, if possible.
 
@@ -262,6 +439,27 @@ class TOAHModel:
         else:
             return found_stool_index
 
+    def get_cheese_locations(self):
+        """
+        Return the index of the stool each cheese is on, where the cheese
+        of size s is at position s - 1, for cheeses of sizes 1 up to
+        get_number_of_cheeses().
+
+        @type self: TOAHModel
+        @rtype: list[int]
+
+        >>> M = TOAHModel(3)
+        >>> M.fill_first_stool(3)
+        >>> M.move(0, 2)
+        >>> M.get_cheese_locations()
+        [2, 0, 0]
+        """
+        locations = [0] * self.get_number_of_cheeses()
+        for (stool_index, stool) in enumerate(self._stools):
+            for cheese in stool:
+                locations[int(cheese.size) - 1] = stool_index
+        return locations
+
     def add(self, add_cheese, stool_index):
         """ Add add_cheese on stool_index.
 
@@ -290,6 +488,13 @@ class TOAHModel:
                                    "that does not exist.")
         except IllegalMoveError:
             raise
+        if self._hash is not None:
+            # a negative stool_index counts back from the last stool
+            stool_index %= self._number_of_stools
+            try:
+                self._hash ^= _ZOBRIST_KEYS[stool_index][add_cheese.size]
+            except IndexError:
+                self._hash ^= _zobrist_key(add_cheese.size, stool_index)
 
     def remove_top_cheese(self, stool_index):
         """
@@ -322,6 +527,13 @@ class TOAHModel:
         except IndexError:
             raise IllegalMoveError("Cannot move a cheese from an empty stool.")
 
+        if self._hash is not None:
+            # a negative stool_index counts back from the last stool
+            stool_index %= self._number_of_stools
+            try:
+                self._hash ^= _ZOBRIST_KEYS[stool_index][removed_cheese.size]
+            except IndexError:
+                self._hash ^= _zobrist_key(removed_cheese.size, stool_index)
         return removed_cheese
 
     def move(self, src_stool, dest_stool):
@@ -354,7 +566,12 @@ class TOAHModel:
 
             # This move will not get registered with the MoveSequence
             # if unable to add move_cheese to the dest_stool
-            self.get_move_seq().add_move(src_stool, dest_stool)
+            if self._undone:
+                self._forget_undone()
+            self._move_seq.add_move(src_stool, dest_stool)
+            self._until_checkpoint -= 1
+            if self._until_checkpoint <= 0:
+                self._checkpoint()
 
         except IllegalMoveError:
             # If unable to add the move_cheese to dest_stool,
@@ -363,13 +580,1011 @@ class TOAHModel:
             self.add(move_cheese, src_stool)
             raise
 
+    def apply_trusted_moves(self, moves):
+        """
+        Apply every (src_stool, dest_stool) move in moves and record them,
+        without checking that they are legal.
+
+        Only for moves known to be legal, such as a solver's output: an
+        illegal move leaves self in a state the rules do not allow. Use
+        MoveSequence.find_illegal_move to check the moves afterwards.
+
+        @type self: TOAHModel
+        @type moves: iterable[tuple[int]]
+        @rtype: None
+
+        >>> M = TOAHModel(3)
+        >>> M.fill_first_stool(2)
+        >>> M.apply_trusted_moves([(0, 1), (0, 2), (1, 2)])
+        >>> M.get_top_cheese(2).size, M.number_of_moves()
+        (1, 3)
+        """
+        if self._undone:
+            self._forget_undone()
+        stools = self._stools
+        # recomputed from the final configuration when next needed
+        self._hash = None
+        until_checkpoint = self._until_checkpoint
+        applied = []
+        for (src_stool, dest_stool) in moves:
+            stools[dest_stool].append(stools[src_stool].pop())
+            applied.append((src_stool, dest_stool))
+            until_checkpoint -= 1
+            if until_checkpoint <= 0:
+                self._move_seq.add_moves(applied)
+                applied = []
+                self._checkpoint()
+                until_checkpoint = self._until_checkpoint
+        self._move_seq.add_moves(applied)
+        self._until_checkpoint = until_checkpoint
+
+    def apply_moves(self, moves, atomic=True):
+        """
+        Apply the (src_stool, dest_stool) moves in moves in order, up to
+        the first one that is illegal, and record them. Return the index
+        of that move in moves, or None if every move is legal.
+
+        If atomic is True, the moves before an illegal move are taken back
+        too, so that either every move is applied or none is. Undone moves
+        can no longer be redone once a move is applied and kept.
+
+        @type self: TOAHModel
+        @type moves: iterable[tuple[int]]
+        @type atomic: bool
+        @rtype: int | None
+
+        >>> M = TOAHModel(3)
+        >>> M.fill_first_stool(2)
+        >>> M.apply_moves([(0, 1), (0, 2), (0, 1)])
+        2
+        >>> M.number_of_moves(), M.get_cheese_locations()
+        (0, [0, 0])
+        >>> M.apply_moves([(0, 1), (0, 2), (0, 1)], atomic=False)
+        2
+        >>> M.number_of_moves(), M.get_cheese_locations()
+        (2, [1, 2])
+        >>> M.undo()
+        >>> M.apply_moves([(0, 0)]), M.apply_moves([(1, 2), (0, 0)])
+        (0, 1)
+        >>> M.redo()
+        >>> M.number_of_moves(), M.get_cheese_locations()
+        (2, [1, 2])
+        """
+        undone = self._undone
+        start = self.number_of_moves()
+        stools = self._stools
+        number_of_stools = self._number_of_stools
+        (old_hash, self._hash) = (self._hash, None)
+        until_checkpoint = self._until_checkpoint
+        (applied, redo_moves) = ([], [])
+        legal = True
+        for (src_stool, dest_stool) in moves:
+            if (0 <= src_stool < number_of_stools and
+                    0 <= dest_stool < number_of_stools and
+                    src_stool != dest_stool):
+                (src, dest) = (stools[src_stool], stools[dest_stool])
+                legal = src and (not dest or dest[-1].size > src[-1].size)
+            else:
+                legal = False
+            if not legal:
+                break
+            if undone:
+                # undone moves are dropped only once a move is made, and
+                # kept aside to redo if an atomic batch is taken back
+                redo_moves = list(self._move_seq[start:]) if atomic else []
+                self._forget_undone()
+                (undone, until_checkpoint) = (0, self._until_checkpoint)
+            dest.append(src.pop())
+            applied.append((src_stool, dest_stool))
+            until_checkpoint -= 1
+            if until_checkpoint <= 0:
+                self._move_seq.add_moves(applied)
+                applied = []
+                self._checkpoint()
+                until_checkpoint = self._until_checkpoint
+        self._move_seq.add_moves(applied)
+        self._until_checkpoint = until_checkpoint
+        return None if legal else self._stop_moves(start, old_hash, atomic,
+                                                   redo_moves)
+
+    def _stop_moves(self, start, old_hash, atomic, redo_moves):
+        """ Return the number of moves self has made since it had made
+        start moves. If atomic is True, take them all back, set the Zobrist
+        hash back to old_hash, and leave redo_moves, the moves undone before
+        they were made, to be redone.
+
+        @type self: TOAHModel
+        @type start: int
+        @type old_hash: int | None
+        @type atomic: bool
+        @type redo_moves: list[tuple[int]]
+        @rtype: int
+        """
+        count = self.number_of_moves() - start
+        if atomic and count:
+            self._take_back(self._move_seq[start:])
+            # forget the moves taken back as if they had been undone
+            self._undone = count
+            self._forget_undone()
+            self._move_seq.add_moves(redo_moves)
+            self._undone = len(redo_moves)
+        if atomic or not count:
+            self._hash = old_hash
+        return count
+
+    def _take_back(self, moves):
+        """ Take back moves, the last moves self made, without checking or
+        recording anything.
+
+        @type self: TOAHModel
+        @type moves: MoveSequence
+        @rtype: None
+        """
+        stools = self._stools
+        for (src_stool, dest_stool) in reversed(list(moves)):
+            stools[src_stool].append(stools[dest_stool].pop())
+
+    def _checkpoint(self):
+        """ Record the sizes on each stool if self has made a multiple of
+        the checkpoint interval of moves and has no record for it yet, and
+        count the moves until the next multiple.
+
+        @type self: TOAHModel
+        @rtype: None
+        """
+        stool_sizes = None
+        if not self._checkpoint_interval:
+            # recording every O(number of cheeses) moves keeps the cost of
+            # checkpoints O(1) a move
+            stool_sizes = self._stool_sizes()
+            self._checkpoint_interval = max(
+                _CHECKPOINT_INTERVAL, sum(len(sizes) for sizes in stool_sizes))
+        (count, left) = divmod(self.number_of_moves(),
+                               self._checkpoint_interval)
+        if not left and count == len(self._checkpoints) + 1:
+            self._checkpoints.append(tuple(
+                array('L', sizes)
+                for sizes in stool_sizes or self._stool_sizes()))
+        self._until_checkpoint = self._checkpoint_interval - left
+
+    def _forget_undone(self):
+        """ Drop the undone moves, and any checkpoints after them, so they
+        can no longer be redone.
+
+        @type self: TOAHModel
+        @rtype: None
+        """
+        position = self.number_of_moves()
+        self._move_seq.truncate(position)
+        if self._checkpoint_interval:
+            del self._checkpoints[position // self._checkpoint_interval:]
+        self._undone = 0
+        self._history += 1
+        self._until_checkpoint = 0
+
+    def _shift(self, src_stool, dest_stool):
+        """ Move the top cheese of src_stool onto dest_stool, if the rules
+        allow, without recording the move.
+
+        @type self: TOAHModel
+        @type src_stool: int
+        @type dest_stool: int
+        @rtype: None
+        """
+        cheese = self.remove_top_cheese(src_stool)
+        try:
+            self.add(cheese, dest_stool)
+        except IllegalMoveError:
+            self.add(cheese, src_stool)
+            raise
+
+    def undo(self):
+        """ Undo the last move that is in effect, so that it can be redone.
+
+        Raise IllegalMoveError if there is no move to undo.
+
+        @type self: TOAHModel
+        @rtype: None
+
+        >>> M = TOAHModel(3)
+        >>> M.fill_first_stool(2)
+        >>> M.move(0, 1)
+        >>> M.undo()
+        >>> M.number_of_moves(), M.get_top_cheese(1)
+        (0, None)
+        >>> M.redo()
+        >>> M.number_of_moves(), M.get_top_cheese(1).size
+        (1, 1)
+        """
+        position = self.number_of_moves()
+        if position == 0:
+            raise IllegalMoveError("There is no move to undo.")
+        (src_stool, dest_stool) = self._move_seq.get_move(position - 1)
+        self._shift(dest_stool, src_stool)
+        self._undone += 1
+        self._history += 1
+        self._until_checkpoint = 0
+
+    def redo(self):
+        """ Redo the move undone last. Making a move drops the moves still
+        undone, so they can no longer be redone.
+
+        Raise IllegalMoveError if there is no move to redo.
+
+        @type self: TOAHModel
+        @rtype: None
+
+        >>> M = TOAHModel(3)
+        >>> M.fill_first_stool(2)
+        >>> M.move(0, 1)
+        >>> M.undo()
+        >>> M.move(0, 2)
+        >>> M.redo()
+        Traceback (most recent call last):
+        ...
+        toah_model.IllegalMoveError: There is no move to redo.
+        """
+        if not self._undone:
+            raise IllegalMoveError("There is no move to redo.")
+        (src_stool, dest_stool) = self._move_seq.get_move(
+            self.number_of_moves())
+        self._shift(src_stool, dest_stool)
+        self._undone -= 1
+        self._until_checkpoint = 0
+
+    def seek(self, move_number):
+        """ Undo or redo moves until move_number moves are in effect. This
+        starts from the nearest checkpoint if that is closer, so it
+        undoes or redoes at most one checkpoint interval of moves.
+
+        Raise IndexError if fewer than move_number moves have been made
+        (and not dropped).
+
+        @type self: TOAHModel
+        @type move_number: int
+        @rtype: None
+
+        >>> M = TOAHModel(4)
+        >>> M.fill_first_stool(10)
+        >>> M.apply_trusted_moves([(0, 1), (1, 2), (2, 0)] * 3000)
+        >>> M.seek(4097)
+        >>> M.number_of_moves(), M.get_top_cheese(2).size
+        (4097, 1)
+        >>> M.seek(8998)
+        >>> M.get_top_cheese(1).size
+        1
+        """
+        total = self._move_seq.length()
+        if not 0 <= move_number <= total:
+            raise IndexError("{0} moves have not been made".format(
+                move_number))
+        position = self.number_of_moves()
+        interval = self._checkpoint_interval
+        if interval:
+            for multiple in (move_number // interval,
+                             move_number // interval + 1):
+                if 0 < multiple <= len(self._checkpoints) and \
+                        abs(multiple * interval - move_number) < \
+                        abs(position - move_number):
+                    self._restore(self._checkpoints[multiple - 1])
+                    position = multiple * interval
+                    self._undone = total - position
+        while position > move_number:
+            self.undo()
+            position -= 1
+        while position < move_number:
+            self.redo()
+            position += 1
+        self._until_checkpoint = 0
+
+    def _restore(self, stool_sizes):
+        """ Put the cheeses of each size in stool_sizes on that stool,
+        bottom first.
+
+        @type self: TOAHModel
+        @type stool_sizes: tuple[array]
+        @rtype: None
+        """
+        cheeses = {}
+        for stool in self._stools:
+            for cheese in stool:
+                cheeses[cheese.size] = cheese
+        self._stools = [[cheeses[cheese_size] for cheese_size in sizes]
+                        for sizes in stool_sizes]
+        self._hash = None
+        self._history += 1
+
+
+class CompactTOAHModel(TOAHModel):
+    """ A TOAHModel that stores its configuration in arrays indexed by
+    cheese size instead of lists of Cheese objects.
+
+    For each size it keeps the stool the cheese is on and the size of the
+    cheese below it, and for each stool the size of its top cheese, so
+    finding a cheese, the top of a stool and checking a move are all O(1),
+    and a cheese takes a few bytes instead of a Cheese object.
+
+    Cheese sizes must be distinct positive ints. Cheese objects given to
+    add are kept, so they are the ones returned by get_top_cheese; other
+    cheeses are returned as new Cheese objects of the right size.
+    """
+
+    def __init__(self, number_of_stools):
+        """ Create new CompactTOAHModel with empty stools
+        to hold stools of cheese.
+
+        @param CompactTOAHModel self:
+        @param int number_of_stools:
+        @rtype: None
+
+        >>> M = CompactTOAHModel(4)
+        >>> M.fill_first_stool(5)
+        >>> M.move(0, 1)
+        >>> M.get_top_cheese(1).size, M.get_cheese_location(Cheese(2))
+        (1, 0)
+        """
+        TOAHModel.__init__(self, number_of_stools)
+        self._stools = None
+        # 1 + the stool each size is on (0 if not in self), by size
+        self._location = array('H', [0])
+        # size of the cheese under each size (0 for none), by size
+        self._below = array('L', [0])
+        # size of the top cheese of each stool (0 for none), and its height
+        self._top = array('L', [0] * number_of_stools)
+        self._height = array('L', [0] * number_of_stools)
+        # Cheese objects given to add, by size
+        self._cheeses = {}
+
+    def fill_first_stool(self, number_of_cheeses):
+        """ Add number_of_cheeses to the first stool.
+
+        @param CompactTOAHModel self:
+        @param int number_of_cheeses:
+        @rtype: None
+        """
+        self.fill_stools([0] * number_of_cheeses)
+
+    def fill_stools(self, locations):
+        """ Add a cheese of size s to stool locations[s - 1] for every
+        size s from len(locations) down to 1.
+
+        @param CompactTOAHModel self:
+        @param list[int] locations:
+        @rtype: None
+
+        >>> M = CompactTOAHModel(3)
+        >>> M.fill_stools([2, 0, 2])
+        >>> M.get_cheese_locations()
+        [2, 0, 2]
+        """
+        if self.get_number_of_cheeses() > 0:
+            raise IllegalMoveError("Has already been filled")
+
+        self._grow(len(locations))
+        for cheese_size in range(len(locations), 0, -1):
+            self._push(cheese_size, locations[cheese_size - 1])
+
+        self._number_of_cheeses = len(locations)
+
+    def _grow(self, cheese_size):
+        """ Make room in the arrays for cheeses up to cheese_size.
+
+        @param CompactTOAHModel self:
+        @param int cheese_size:
+        @rtype: None
+        """
+        extra = cheese_size + 1 - len(self._location)
+        if extra > 0:
+            self._location.extend(array('H', [0]) * extra)
+            self._below.extend(array('L', [0]) * extra)
+
+    def _push(self, cheese_size, stool_index):
+        """ Put the cheese of cheese_size on stool_index, unchecked.
+
+        @param CompactTOAHModel self:
+        @param int cheese_size:
+        @param int stool_index:
+        @rtype: None
+        """
+        self._below[cheese_size] = self._top[stool_index]
+        self._top[stool_index] = cheese_size
+        self._height[stool_index] += 1
+        self._location[cheese_size] = stool_index + 1
+        if self._hash is not None:
+            try:
+                self._hash ^= _ZOBRIST_KEYS[stool_index][cheese_size]
+            except IndexError:
+                self._hash ^= _zobrist_key(cheese_size, stool_index)
+
+    def _pop(self, stool_index):
+        """ Take the top cheese off stool_index, unchecked, and return its
+        size.
+
+        @param CompactTOAHModel self:
+        @param int stool_index:
+        @rtype: int
+        """
+        cheese_size = self._top[stool_index]
+        self._top[stool_index] = self._below[cheese_size]
+        self._height[stool_index] -= 1
+        self._location[cheese_size] = 0
+        if self._hash is not None:
+            try:
+                self._hash ^= _ZOBRIST_KEYS[stool_index][cheese_size]
+            except IndexError:
+                self._hash ^= _zobrist_key(cheese_size, stool_index)
+        return cheese_size
+
+    def _cheese(self, cheese_size):
+        """ Return the Cheese for cheese_size.
+
+        @param CompactTOAHModel self:
+        @param int cheese_size:
+        @rtype: Cheese
+        """
+        cheese = self._cheeses.get(cheese_size)
+        return Cheese(cheese_size) if cheese is None else cheese
+
+    def __eq__(self, other):
+        """ Return whether CompactTOAHModel self is equivalent to other,
+        which may be any TOAHModel.
+
+        @type self: CompactTOAHModel
+        @type other: TOAHModel
+        @rtype: bool
+
+        >>> m1 = CompactTOAHModel(4)
+        >>> m1.fill_first_stool(3)
+        >>> m2 = TOAHModel(4)
+        >>> m2.fill_first_stool(3)
+        >>> m1 == m2, m2 == m1
+        (True, True)
+        >>> m1.move(0, 1)
+        >>> m1 == m2
+        False
+        """
+        return (isinstance(other, TOAHModel) and
+                self.get_number_of_stools() == other.get_number_of_stools()
+                and self.zobrist_hash() == other.zobrist_hash()
+                and self._stool_sizes() == other._stool_sizes())
+
+    __hash__ = TOAHModel.__hash__
+
+    def _stool_sizes(self):
+        """ Return the sizes of the cheeses on each stool, bottom first.
+
+        @type self: CompactTOAHModel
+        @rtype: list[list[int]]
+        """
+        stool_sizes = []
+        for cheese_size in self._top:
+            sizes = []
+            while cheese_size:
+                sizes.append(cheese_size)
+                cheese_size = self._below[cheese_size]
+            sizes.reverse()
+            stool_sizes.append(sizes)
+        return stool_sizes
+
+    def _cheese_at(self, stool_index, stool_height):
+        """ Return (stool_height)th from stool_index stool, if possible.
+
+        This walks down from the top of the stool.
+
+        @type self: CompactTOAHModel
+        @type stool_index: int
+        @type stool_height: int
+        @rtype: Cheese | None
+
+        >>> M = CompactTOAHModel(4)
+        >>> M.fill_first_stool(5)
+        >>> M._cheese_at(0,3).size
+        2
+        """
+        if not 0 <= stool_height < self._height[stool_index]:
+            return None
+        cheese_size = self._top[stool_index]
+        for _ in range(self._height[stool_index] - 1 - stool_height):
+            cheese_size = self._below[cheese_size]
+        return self._cheese(cheese_size)
+
+    def get_top_cheese(self, stool_index):
+        """
+        Return the top (smallest) Cheese at the specified stool_index.
+        If there are no Cheeses on the stool at stool_index,
+        or if the stool does not exist, return None.
+
+        @type self: CompactTOAHModel
+        @type stool_index: int
+        @rtype: Cheese | None
+        """
+        if 0 <= stool_index < self.get_number_of_stools() and \
+                self._top[stool_index]:
+            return self._cheese(self._top[stool_index])
+        return None
+
+    def get_cheese_location(self, cheese):
+        """
+        Find and return the index of the stool that cheese (or the cheese
+        of its size) is on in this CompactTOAHModel
+
+        Raise ValueError if the cheese is not found.
+
+        @type self: CompactTOAHModel
+        @type cheese: Cheese
+        @rtype: int
+        """
+        if 0 < cheese.size < len(self._location) and \
+                self._location[cheese.size]:
+            return self._location[cheese.size] - 1
+        raise ValueError("cheese was not found in the TOAHModel")
+
+    def get_cheese_locations(self):
+        """
+        Return the index of the stool each cheese is on, where the cheese
+        of size s is at position s - 1, for cheeses of sizes 1 up to
+        get_number_of_cheeses().
+
+        @type self: CompactTOAHModel
+        @rtype: list[int]
+        """
+        return [location - 1 for location in
+                self._location[1:self.get_number_of_cheeses() + 1]]
+
+    def add(self, add_cheese, stool_index):
+        """ Add add_cheese on stool_index.
+
+        @param CompactTOAHModel self:
+        @param Cheese add_cheese:
+        @param int stool_index:
+        @rtype: None
+        """
+        if not 0 <= stool_index < self.get_number_of_stools():
+            raise IllegalMoveError("Cannot put a cheese onto a stool "
+                                   "that does not exist.")
+        if 0 < self._top[stool_index] < add_cheese.size:
+            raise IllegalMoveError("Cannot put a bigger cheese on a "
+                                   "smaller one.")
+        self._grow(add_cheese.size)
+        self._cheeses[add_cheese.size] = add_cheese
+        self._push(add_cheese.size, stool_index)
+
+    def remove_top_cheese(self, stool_index):
+        """
+        Remove and return the top Cheese at the specifed stool_index.
+        Raise an InvalidMoveError if there are no Cheeses at stool_index,
+        or if the stool does not exist
+
+        @param CompactTOAHModel self:
+        @param int stool_index:
+        @rtype: Cheese
+        """
+        if not 0 <= stool_index < self.get_number_of_stools():
+            raise IllegalMoveError("Cannot remove a cheese from a stool that "
+                                   "does not exist.")
+        if not self._top[stool_index]:
+            raise IllegalMoveError("Cannot move a cheese from an empty stool.")
+        cheese = self._cheese(self._pop(stool_index))
+        self._cheeses.pop(cheese.size, None)
+        return cheese
+
+    def move(self, src_stool, dest_stool):
+        """
+        Remove the top Cheese from src_stool and add it onto dest_stool.
+
+        If this cannot be done according to the rules of the game,
+        raise IllegalMoveError.
+
+        @type self: CompactTOAHModel
+        @type src_stool: int
+        @type dest_stool: int
+        @rtype: None
+        """
+        if src_stool == dest_stool:
+            raise IllegalMoveError("Source stool and destination stool "
+                                   "cannot be the same stool.")
+        if not 0 <= src_stool < self.get_number_of_stools():
+            raise IllegalMoveError("Cannot remove a cheese from a stool that "
+                                   "does not exist.")
+        if not self._top[src_stool]:
+            raise IllegalMoveError("Cannot move a cheese from an empty stool.")
+        if not 0 <= dest_stool < self.get_number_of_stools():
+            raise IllegalMoveError("Cannot put a cheese onto a stool "
+                                   "that does not exist.")
+        if 0 < self._top[dest_stool] < self._top[src_stool]:
+            raise IllegalMoveError("Cannot put a bigger cheese on a "
+                                   "smaller one.")
+        self._push(self._pop(src_stool), dest_stool)
+        if self._undone:
+            self._forget_undone()
+        self._move_seq.add_move(src_stool, dest_stool)
+        self._until_checkpoint -= 1
+        if self._until_checkpoint <= 0:
+            self._checkpoint()
+
+    def apply_trusted_moves(self, moves):
+        """
+        Apply every (src_stool, dest_stool) move in moves and record them,
+        without checking that they are legal.
+
+        @type self: CompactTOAHModel
+        @type moves: iterable[tuple[int]]
+        @rtype: None
+
+        >>> M = CompactTOAHModel(3)
+        >>> M.fill_first_stool(2)
+        >>> M.apply_trusted_moves([(0, 1), (0, 2), (1, 2)])
+        >>> M.get_cheese_locations()
+        [2, 2]
+        """
+        if self._undone:
+            self._forget_undone()
+        (location, below, top, height) = (self._location, self._below,
+                                          self._top, self._height)
+        self._hash = None
+        until_checkpoint = self._until_checkpoint
+        applied = []
+        for (src_stool, dest_stool) in moves:
+            cheese_size = top[src_stool]
+            top[src_stool] = below[cheese_size]
+            height[src_stool] -= 1
+            below[cheese_size] = top[dest_stool]
+            top[dest_stool] = cheese_size
+            height[dest_stool] += 1
+            location[cheese_size] = dest_stool + 1
+            applied.append((src_stool, dest_stool))
+            until_checkpoint -= 1
+            if until_checkpoint <= 0:
+                self._move_seq.add_moves(applied)
+                applied = []
+                self._checkpoint()
+                until_checkpoint = self._until_checkpoint
+        self._move_seq.add_moves(applied)
+        self._until_checkpoint = until_checkpoint
+
+    def apply_moves(self, moves, atomic=True):
+        """
+        Apply the (src_stool, dest_stool) moves in moves in order, up to
+        the first one that is illegal, and record them. Return the index
+        of that move in moves, or None if every move is legal.
+
+        If atomic is True, the moves before an illegal move are taken back
+        too, so that either every move is applied or none is. Undone moves
+        can no longer be redone once a move is applied and kept.
+
+        @type self: CompactTOAHModel
+        @type moves: iterable[tuple[int]]
+        @type atomic: bool
+        @rtype: int | None
+
+        >>> M = CompactTOAHModel(3)
+        >>> M.fill_first_stool(2)
+        >>> M.apply_moves([(0, 1), (0, 2), (1, 3)])
+        2
+        >>> M.number_of_moves(), M.get_cheese_locations()
+        (0, [0, 0])
+        >>> M.apply_moves([(0, 1), (0, 2), (1, 2)])
+        >>> M.number_of_moves(), M.get_cheese_locations()
+        (3, [2, 2])
+        >>> M.undo()
+        >>> M.apply_moves([(2, 2)]), M.apply_moves([(2, 0), (2, 2)])
+        (0, 1)
+        >>> M.redo()
+        >>> M.number_of_moves(), M.get_cheese_locations()
+        (3, [2, 2])
+        """
+        undone = self._undone
+        start = self.number_of_moves()
+        (location, below, top, height) = (self._location, self._below,
+                                          self._top, self._height)
+        number_of_stools = self.get_number_of_stools()
+        (old_hash, self._hash) = (self._hash, None)
+        until_checkpoint = self._until_checkpoint
+        (applied, redo_moves) = ([], [])
+        legal = True
+        for (src_stool, dest_stool) in moves:
+            if (0 <= src_stool < number_of_stools and
+                    0 <= dest_stool < number_of_stools and
+                    src_stool != dest_stool):
+                cheese_size = top[src_stool]
+                legal = cheese_size and not 0 < top[dest_stool] < cheese_size
+            else:
+                legal = False
+            if not legal:
+                break
+            if undone:
+                # undone moves are dropped only once a move is made, and
+                # kept aside to redo if an atomic batch is taken back
+                redo_moves = list(self._move_seq[start:]) if atomic else []
+                self._forget_undone()
+                (undone, until_checkpoint) = (0, self._until_checkpoint)
+            top[src_stool] = below[cheese_size]
+            height[src_stool] -= 1
+            below[cheese_size] = top[dest_stool]
+            top[dest_stool] = cheese_size
+            height[dest_stool] += 1
+            location[cheese_size] = dest_stool + 1
+            applied.append((src_stool, dest_stool))
+            until_checkpoint -= 1
+            if until_checkpoint <= 0:
+                self._move_seq.add_moves(applied)
+                applied = []
+                self._checkpoint()
+                until_checkpoint = self._until_checkpoint
+        self._move_seq.add_moves(applied)
+        self._until_checkpoint = until_checkpoint
+        return None if legal else self._stop_moves(start, old_hash, atomic,
+                                                   redo_moves)
+
+    def _take_back(self, moves):
+        """ Take back moves, the last moves self made, without checking or
+        recording anything.
+
+        @type self: CompactTOAHModel
+        @type moves: MoveSequence
+        @rtype: None
+        """
+        (location, below, top, height) = (self._location, self._below,
+                                          self._top, self._height)
+        for (src_stool, dest_stool) in reversed(list(moves)):
+            cheese_size = top[dest_stool]
+            top[dest_stool] = below[cheese_size]
+            height[dest_stool] -= 1
+            below[cheese_size] = top[src_stool]
+            top[src_stool] = cheese_size
+            height[src_stool] += 1
+            location[cheese_size] = src_stool + 1
+
+    def _restore(self, stool_sizes):
+        """ Put the cheeses of each size in stool_sizes on that stool,
+        bottom first.
+
+        @type self: CompactTOAHModel
+        @type stool_sizes: tuple[array]
+        @rtype: None
+        """
+        self._hash = None
+        self._history += 1
+        for stool_index in range(self.get_number_of_stools()):
+            self._top[stool_index] = 0
+            self._height[stool_index] = 0
+        for (stool_index, sizes) in enumerate(stool_sizes):
+            for cheese_size in sizes:
+                self._push(cheese_size, stool_index)
+
+
+class TOAHRenderer:
+    """ Render a TOAHModel as text, as TOAHModel.__str__ does, keeping the
+    text of each row between renderings.
+
+    Keep one TOAHRenderer for a model that is shown after every move:
+    the text of each cheese size is made once, and rendering again after
+    a few moves redraws only the rows they touched, instead of the whole
+    model. render can also show just the top rows of very tall stacks.
+
+    === Attributes ===
+    @param TOAHModel model: the model rendered
+    """
+
+    def __init__(self, model):
+        """ Create a new TOAHRenderer self for model.
+
+        @type self: TOAHRenderer
+        @type model: TOAHModel
+        @rtype: None
+        """
+        self.model = model
+        # the sizes on each stool as last drawn, their Zobrist hash, and
+        # the number of moves the model had made and its history count then
+        self._stool_sizes = []
+        self._hash = 0
+        self._number_of_moves = 0
+        self._history = 0
+        # text of a blank cell and of each cheese size, with the spacing
+        # after it, and of each row, bottom first
+        self._cells = []
+        self._rows = []
+        self._base = ""
+        self._rebuild()
+
+    def render(self, max_rows=None):
+        """ Return the text of self's model, showing at most max_rows rows,
+        or every row if max_rows is None. Empty rows at the top are left
+        out first, then rows at the bottom, with a row of colons in their
+        place.
+
+        @type self: TOAHRenderer
+        @type max_rows: int | None
+        @rtype: str
+
+        >>> M = TOAHModel(3)
+        >>> M.fill_first_stool(3)
+        >>> renderer = TOAHRenderer(M)
+        >>> M.move(0, 2)
+        >>> print(renderer.render(2))  # doctest: +NORMALIZE_WHITESPACE
+          ---
+         -----               -
+        =======  =======  =======
+        >>> renderer.render() == str(M)
+        True
+        >>> print(renderer.render(1))  # doctest: +NORMALIZE_WHITESPACE
+          ---
+           :        :        :
+        =======  =======  =======
+        >>> M = TOAHModel(3)
+        >>> M.fill_first_stool(2)
+        >>> renderer = TOAHRenderer(M)
+        >>> M.move(0, 1)
+        >>> _ = renderer.render()
+        >>> M.undo()
+        >>> for (src_stool, dest_stool) in [(0, 2), (0, 1), (2, 1)]:
+        ...     M.move(src_stool, dest_stool)
+        >>> renderer.render() == str(M)
+        True
+        """
+        self._update()
+        rows = self._rows
+        if max_rows is None or max_rows >= len(rows):
+            return "".join(rows[::-1] + [self._base])
+        tallest = max([len(sizes) for sizes in self._stool_sizes] + [0])
+        top = max(tallest, max_rows)
+        text = "".join(reversed(rows[top - max_rows:top]))
+        if top > max_rows:
+            text += (" " * (len(self._cells) - 1) + ":" +
+                     " " * (len(self._cells) + 1)) * len(self._stool_sizes)
+            text += "\n"
+        return text + self._base
+
+    def _update(self):
+        """ Redraw the rows of self that changed since it was last drawn.
+
+        @type self: TOAHRenderer
+        @rtype: None
+        """
+        model = self.model
+        if (model.get_number_of_cheeses() != len(self._rows) or
+                model.get_number_of_stools() != len(self._stool_sizes) or
+                model._history != self._history):
+            # moves were taken back, so the moves since are not just
+            # those after the ones last drawn
+            self._rebuild()
+            return
+        number_of_moves = model.number_of_moves()
+        if (self._number_of_moves < number_of_moves <=
+                self._number_of_moves + len(self._rows)):
+            # just these moves were made since; the hash check below
+            # catches cheeses moved by other means
+            for (src_stool, dest_stool) in model.get_move_seq()[
+                    self._number_of_moves:number_of_moves]:
+                self._move(src_stool, dest_stool)
+        self._number_of_moves = number_of_moves
+        if self._hash != model.zobrist_hash():
+            self._catch_up()
+
+    def _move(self, src_stool, dest_stool):
+        """ Draw the move of the top cheese of src_stool onto dest_stool.
+
+        @type self: TOAHRenderer
+        @type src_stool: int
+        @type dest_stool: int
+        @rtype: None
+        """
+        src = self._stool_sizes[src_stool]
+        if not src:
+            return
+        cheese_size = src.pop()
+        self._redraw(src_stool, len(src))
+        self._stool_sizes[dest_stool].append(cheese_size)
+        self._redraw(dest_stool, len(self._stool_sizes[dest_stool]) - 1)
+        self._hash ^= (_zobrist_key(cheese_size, src_stool) ^
+                       _zobrist_key(cheese_size, dest_stool))
+
+    def _catch_up(self):
+        """ Redraw the rows of each stool above the cheeses it still has
+        where they were last drawn.
+
+        @type self: TOAHRenderer
+        @rtype: None
+        """
+        stool_sizes = self.model._stool_sizes()
+        for sizes in stool_sizes:
+            if sizes and max(sizes) >= len(self._cells):
+                self._rebuild()
+                return
+        (old_stool_sizes, self._stool_sizes) = (self._stool_sizes,
+                                                stool_sizes)
+        for (stool_index, (old, new)) in enumerate(zip(old_stool_sizes,
+                                                       stool_sizes)):
+            same = min(len(old), len(new))
+            if old[:same] != new[:same]:
+                same = 0
+                while old[same] == new[same]:
+                    same += 1
+            for height in range(same, max(len(old), len(new))):
+                self._redraw(stool_index, height)
+        self._hash = self.model.zobrist_hash()
+
+    def _redraw(self, stool_index, height):
+        """ Draw the cheese at height on stool_index, or a blank if there
+        is none.
+
+        @type self: TOAHRenderer
+        @type stool_index: int
+        @type height: int
+        @rtype: None
+        """
+        if height >= len(self._rows):
+            return
+        sizes = self._stool_sizes[stool_index]
+        cell = self._cells[sizes[height] if height < len(sizes) else 0]
+        start = stool_index * len(cell)
+        row = self._rows[height]
+        self._rows[height] = row[:start] + cell + row[start + len(cell):]
+
+    def _rebuild(self):
+        """ Draw every row of self from scratch.
+
+        @type self: TOAHRenderer
+        @rtype: None
+        """
+        model = self.model
+        self._stool_sizes = [list(sizes) for sizes in model._stool_sizes()]
+        self._hash = model.zobrist_hash()
+        self._number_of_moves = model.number_of_moves()
+        self._history = model._history
+        all_sizes = [size for sizes in self._stool_sizes for size in sizes]
+        max_cheese_size = max(all_sizes) if len(all_sizes) > 0 else 0
+        self._cells = [" " * (2 * max_cheese_size + 1) + "  "]
+        for cheese_size in range(1, max_cheese_size + 1):
+            space_filler = " " * (max_cheese_size - cheese_size + 1)
+            self._cells.append(space_filler + "-" * (2 * cheese_size - 1) +
+                               space_filler + "  ")
+        self._base = ("=" * (2 * max_cheese_size + 1) + "  ") * len(
+            self._stool_sizes)
+        self._rows = []
+        for height in range(model.get_number_of_cheeses()):
+            self._rows.append("".join(
+                [self._cells[sizes[height] if height < len(sizes) else 0]
+                 for sizes in self._stool_sizes]) + "\n")
+
 
 class Cheese:
     """ A cheese for stacking in a TOAHModel
 
+    Plain Cheeses of int size are interned: Cheese(size) always returns
+    the same object for the same size, so do not change a Cheese's size.
+    Subclasses such as CheeseView carry their own state and get a new
+    object each time.
+
     === Attributes ===
     @param int size: width of cheese
     """
+    __slots__ = ('size',)
+
+    # the one plain Cheese of each int size
+    _interned = {}
+
+    def __new__(cls, size, *args, **kwargs):
+        """ Return the interned Cheese of size, or a new object for a
+        subclass or a size that is not an int.
+
+        @param type cls:
+        @param int size:
+        @rtype: Cheese
+
+        >>> Cheese(3) is Cheese(3)
+        True
+        >>> Cheese(3.0) is Cheese(3), Cheese(3).size
+        (False, 3)
+        """
+        if cls is not Cheese or type(size) is not int:
+            return object.__new__(cls)
+        cheese = Cheese._interned.get(size)
+        if cheese is None:
+            cheese = object.__new__(cls)
+            cheese.size = size
+            Cheese._interned[size] = cheese
+        return cheese
 
     def __init__(self, size):
         """ Initialize a Cheese to diameter size.
@@ -384,8 +1599,27 @@ class Cheese:
         >>> c.size
         3
         """
-        # pass =====================
-        self.size = size
+        # an interned Cheese got its size in __new__ and is shared
+        if type(self) is not Cheese or type(size) is not int:
+            self.size = size
+
+    def __getnewargs__(self):
+        """ Return the arguments to __new__ that recreate self, so copies
+        and unpickled plain Cheeses are the interned ones.
+
+        @param Cheese self:
+        @rtype: tuple[int]
+
+        >>> import copy, pickle
+        >>> model = TOAHModel(3)
+        >>> model.fill_first_stool(4)
+        >>> model.move(0, 1)
+        >>> pickle.loads(pickle.dumps(model)) == model
+        True
+        >>> copy.deepcopy(model) == model, copy.copy(Cheese(3)) is Cheese(3)
+        (True, True)
+        """
+        return (self.size,)
 
     def __eq__(self, other):
         """ Is self equivalent to other?
@@ -397,7 +1631,8 @@ class Cheese:
         @param Cheese|Any other:
         @rtype: bool
         """
-        return isinstance(other, Cheese) and self.size == other.size
+        return self is other or (isinstance(other, Cheese) and
+                                 self.size == other.size)
 
 
 class IllegalMoveError(Exception):
@@ -406,8 +1641,145 @@ class IllegalMoveError(Exception):
     pass
 
 
+# Widths, in bits per stool, of the MoveSequence encodings. _UNPACKED is
+# the fallback for stools that do not fit in 16 bits (or are not ints).
+_NIBBLES = 4
+_BYTES = 8
+_SHORTS = 16
+_UNPACKED = 64
+
+# the move for each one-byte code of the narrowest encoding
+_NIBBLE_MOVES = [(code >> 4, code & 15) for code in range(256)]
+# translate tables from a one-byte code to its source and destination
+_NIBBLE_SOURCES = bytes(code >> 4 for code in range(256))
+_NIBBLE_DESTINATIONS = bytes(code & 15 for code in range(256))
+
+# MoveSequences are compared a chunk of this many moves at a time, by a
+# hash of each prefix of whole chunks
+_DIGEST_CHUNK = 1 << 12
+
+
+def _stool_width(flat_moves):
+    """ Return the narrowest encoding width that holds every stool in
+    flat_moves, assuming any stool that is not negative is an int.
+
+    @param list[int] flat_moves:
+    @rtype: int
+
+    >>> _stool_width([0, 15]), _stool_width([0, 16]), _stool_width([-1, 0])
+    (4, 8, 64)
+    """
+    try:
+        if min(flat_moves, default=0) < 0:
+            return _UNPACKED
+        largest = max(flat_moves, default=0)
+    except TypeError:
+        return _UNPACKED
+    if largest < 16:
+        return _NIBBLES
+    elif largest < 256:
+        return _BYTES
+    elif largest < 65536:
+        return _SHORTS
+    return _UNPACKED
+
+
+def pack_moves(moves, flat_moves, width):
+    """ Return moves, which flat_moves lists as src, dest, src, dest, ...,
+    packed as MoveSequence.get_buffer gives them: each move in a byte,
+    source stool in the high 4 bits, if width is 4, and each stool in an
+    unsigned int of width bits if width is 8 or 16. For any other width,
+    return the moves as a list.
+
+    Raise TypeError if width is 4, 8 or 16 and a stool is not an int.
+
+    @param list[tuple[int]] moves:
+    @param list[int] flat_moves:
+    @param int width:
+    @rtype: array | list[tuple[int]]
+
+    >>> list(pack_moves([(1, 2), (3, 0)], [1, 2, 3, 0], 4))
+    [18, 48]
+    >>> list(pack_moves([(1, 2), (3, 0)], [1, 2, 3, 0], 8))
+    [1, 2, 3, 0]
+    """
+    if width == _NIBBLES:
+        return array('B', [src << 4 | dest for (src, dest) in moves])
+    elif width == _BYTES:
+        return array('B', flat_moves)
+    elif width == _SHORTS:
+        return array('H', flat_moves)
+    return list(zip(flat_moves[0::2], flat_moves[1::2]))
+
+
+def _canonical_moves(move_seq):
+    """ Return bytes that encode the moves in move_seq, the same way for
+    any MoveSequence with the same moves: a 1 then one byte per stool if
+    every stool fits in a byte, a 2 then two little-endian bytes per stool
+    if every stool fits in those, and a 3 then the moves' repr otherwise.
+
+    @param MoveSequence move_seq:
+    @rtype: bytes
+
+    >>> _canonical_moves(MoveSequence([(1, 2)]))
+    b'\\x01\\x01\\x02'
+    >>> _canonical_moves(MoveSequence([(1, 2), (300, 0)])[:1])
+    b'\\x01\\x01\\x02'
+    """
+    packed = move_seq.get_buffer()
+    if packed is None:
+        moves = list(move_seq)
+        flat_moves = list(chain.from_iterable(moves))
+        width = _stool_width(flat_moves)
+        if width == _UNPACKED:
+            return b'\x03' + repr(moves).encode()
+        elif width != _SHORTS:
+            return b'\x01' + bytes(flat_moves)
+        shorts = array('H', flat_moves)
+    elif packed[0] == _NIBBLES:
+        codes = packed[1].tobytes()
+        stools = bytearray(2 * len(codes))
+        stools[0::2] = codes.translate(_NIBBLE_SOURCES)
+        stools[1::2] = codes.translate(_NIBBLE_DESTINATIONS)
+        return b'\x01' + stools
+    elif packed[0] == _BYTES:
+        return b'\x01' + packed[1].tobytes()
+    else:
+        shorts = _copy_packed(packed[1])
+    if sys.byteorder == 'big':
+        shorts.byteswap()
+    stools = shorts.tobytes()
+    if stools[1::2].count(0) == len(shorts):
+        # the high byte of every stool is 0
+        return b'\x01' + stools[0::2]
+    return b'\x02' + stools
+
+
+def _copy_packed(packed):
+    """ Return a new array holding the moves in packed.
+
+    @param array|memoryview packed:
+    @rtype: array
+
+    >>> list(_copy_packed(memoryview(array('H', [1, 2]))))
+    [1, 2]
+    """
+    if isinstance(packed, memoryview):
+        copy = array(packed.format)
+    else:
+        copy = array(packed.typecode)
+    copy.frombytes(memoryview(packed).cast('B'))
+    return copy
+
+
 class MoveSequence(object):
     """ Sequence of moves in TOAH game
+
+    Moves are packed into an array: one byte per move while every stool
+    is below 16, one byte per stool while below 256, two bytes per stool
+    while below 65536, and a list of tuples otherwise, since the moves
+    need not be legal. The encoding widens as moves are added. Slices
+    share the packed moves instead of copying them.
     """
     def __init__(self, moves):
         """ Create a new MoveSequence self.
@@ -416,8 +1788,62 @@ class MoveSequence(object):
         @param list[tuple[int]] moves:
         @rtype: None
         """
-        # moves - a list of integer pairs, e.g. [(0,1),(0,2),(1,2)]
-        self._moves = moves
+        # moves - a list of integer pairs, e.g. [(0,1),(0,2),(1,2)],
+        # packed with self._width bits per stool
+        self._width = _NIBBLES
+        self._packed = array('B')
+        # hash of the moves in the first j + 1 whole chunks, by j
+        self._digests = []
+        self.add_moves(moves)
+
+    @classmethod
+    def from_buffer(cls, buffer, width):
+        """ Return a MoveSequence over the moves packed in buffer with
+        width (4, 8 or 16) bits per stool, without copying them. It copies
+        them only if moves are added to it.
+
+        @param type cls:
+        @param memoryview buffer:
+        @param int width:
+        @rtype: MoveSequence
+
+        >>> MoveSequence.from_buffer(memoryview(bytes([1, 2])), 8).get_move(0)
+        (1, 2)
+        """
+        if width not in (_NIBBLES, _BYTES, _SHORTS):
+            raise ValueError("Unknown move width {0}".format(width))
+        move_seq = cls([])
+        move_seq._width = width
+        move_seq._packed = memoryview(buffer).cast(
+            'H' if width == _SHORTS else 'B')
+        return move_seq
+
+    def get_buffer(self):
+        """ Return the width (4, 8 or 16 bits per stool) of the encoding of
+        self's moves and a memoryview of them, or None if they are not
+        packed.
+
+        @param MoveSequence self:
+        @rtype: tuple[int, memoryview] | None
+
+        >>> width, buffer = MoveSequence([(1, 2)]).get_buffer()
+        >>> width, buffer.tobytes()
+        (4, b'\\x12')
+        """
+        if self._width == _UNPACKED:
+            return None
+        return (self._width, memoryview(self._packed))
+
+    def __getstate__(self):
+        """ Return the state to pickle, with a slice's moves copied out.
+
+        @param MoveSequence self:
+        @rtype: dict
+        """
+        state = self.__dict__.copy()
+        if isinstance(self._packed, memoryview):
+            state['_packed'] = _copy_packed(self._packed)
+        return state
 
     def get_move(self, i):
         """ Return the move at position i in self
@@ -429,9 +1855,62 @@ class MoveSequence(object):
         >>> ms = MoveSequence([(1, 2)])
         >>> ms.get_move(0) == (1, 2)
         True
+        >>> MoveSequence([(0, 1), (300, 2)]).get_move(-1)
+        (300, 2)
         """
         # Exception if not (0 <= i < self.length)
-        return self._moves[i]
+        if self._width == _NIBBLES:
+            return _NIBBLE_MOVES[self._packed[i]]
+        elif self._width == _UNPACKED:
+            return self._packed[i]
+        if i < 0:
+            i += self.length()
+        if not 0 <= i < self.length():
+            raise IndexError("move index out of range")
+        return (self._packed[2 * i], self._packed[2 * i + 1])
+
+    def __getitem__(self, index):
+        """ Return the move at position index, or a MoveSequence of the
+        moves in slice index, which shares self's packed moves.
+
+        @param MoveSequence self:
+        @param int|slice index:
+        @rtype: tuple[int] | MoveSequence
+
+        >>> ms = MoveSequence([(0, 1), (0, 2), (1, 2)])
+        >>> ms[1:] == MoveSequence([(0, 2), (1, 2)])
+        True
+        """
+        if not isinstance(index, slice):
+            return self.get_move(index)
+        (start, stop, step) = index.indices(self.length())
+        if step != 1:
+            raise ValueError("MoveSequence slices must be contiguous")
+        part = MoveSequence([])
+        part._width = self._width
+        if self._width == _UNPACKED:
+            part._packed = self._packed[start:stop]
+        else:
+            per_move = 1 if self._width == _NIBBLES else 2
+            part._packed = memoryview(self._packed)[
+                per_move * start:per_move * max(start, stop)]
+        return part
+
+    def __iter__(self):
+        """ Return an iterator over the moves in self.
+
+        @param MoveSequence self:
+        @rtype: iterator[tuple[int]]
+
+        >>> list(MoveSequence([(0, 1), (20, 2)]))
+        [(0, 1), (20, 2)]
+        """
+        if self._width == _NIBBLES:
+            return map(_NIBBLE_MOVES.__getitem__, self._packed)
+        elif self._width == _UNPACKED:
+            return iter(self._packed)
+        stools = iter(self._packed)
+        return zip(stools, stools)
 
     def add_move(self, src_stool, dest_stool):
         """ Add move from src_stool to dest_stool to MoveSequence self.
@@ -441,7 +1920,57 @@ class MoveSequence(object):
         @param int dest_stool:
         @rtype: None
         """
-        self._moves.append((src_stool, dest_stool))
+        if self._width == _NIBBLES and 0 <= src_stool < 16 and \
+                0 <= dest_stool < 16:
+            try:
+                self._packed.append(src_stool << 4 | dest_stool)
+                return
+            except (TypeError, AttributeError, BufferError):
+                # stools that are not ints, self is a slice, or a slice of
+                # self is still in use
+                pass
+        self.add_moves([(src_stool, dest_stool)])
+
+    def add_moves(self, moves):
+        """ Add every (src_stool, dest_stool) move in moves to
+        MoveSequence self, in order.
+
+        @param MoveSequence self:
+        @param iterable[tuple[int]] moves:
+        @rtype: None
+
+        >>> ms = MoveSequence([])
+        >>> ms.add_moves([(0, 1), (0, 2)])
+        >>> ms.length()
+        2
+        >>> ms.add_moves([(0, 1000)])
+        >>> ms.get_move(2)
+        (0, 1000)
+        """
+        moves = list(moves)
+        flat_moves = list(chain.from_iterable(moves))
+        if not flat_moves:
+            return
+        width = max(self._width, _stool_width(flat_moves))
+        try:
+            packed_moves = pack_moves(moves, flat_moves, width)
+        except TypeError:
+            width = _UNPACKED
+            packed_moves = pack_moves(moves, flat_moves, width)
+        if width != self._width:
+            old_moves = list(self)
+            self._packed = pack_moves(old_moves, list(chain.from_iterable(
+                old_moves)), width)
+            self._width = width
+        elif isinstance(self._packed, memoryview):
+            # self is a slice, so it needs moves of its own to grow
+            self._packed = _copy_packed(self._packed)
+        try:
+            self._packed.extend(packed_moves)
+        except BufferError:
+            # a slice of self still shares the moves, so leave them to it
+            self._packed = _copy_packed(self._packed)
+            self._packed.extend(packed_moves)
 
     def length(self):
         """ Return number of moves in self.
@@ -453,7 +1982,33 @@ class MoveSequence(object):
         >>> ms.length()
         1
         """
-        return len(self._moves)
+        if self._width == _NIBBLES or self._width == _UNPACKED:
+            return len(self._packed)
+        return len(self._packed) // 2
+
+    def truncate(self, length):
+        """ Remove the moves in self after the first length.
+
+        @param MoveSequence self:
+        @param int length:
+        @rtype: None
+
+        >>> ms = MoveSequence([(0, 1), (0, 2), (1, 2)])
+        >>> ms.truncate(1)
+        >>> list(ms)
+        [(0, 1)]
+        """
+        del self._digests[length // _DIGEST_CHUNK:]
+        if self._width == _BYTES or self._width == _SHORTS:
+            length *= 2
+        if isinstance(self._packed, memoryview):
+            self._packed = self._packed[:length]
+            return
+        try:
+            del self._packed[length:]
+        except BufferError:
+            # a slice of self still shares the moves, so leave them to it
+            self._packed = self._packed[:length]
 
     def __eq__(self, other):
         """Is self equivalent to other? We say they are if they're the same
@@ -462,8 +2017,129 @@ class MoveSequence(object):
         @type self: MoveSequence
         @type other: MoveSequence
         @rtype: bool
+
+        >>> MoveSequence([(0, 1)]) == MoveSequence([(0, 1), (0, 300)])[:1]
+        True
+        """
+        if not isinstance(other, MoveSequence):
+            return False
+        elif self.length() != other.length():
+            return False
+        elif self._width == other._width:
+            return self._packed == other._packed
+        return self.first_difference(other) is None
+
+    def first_difference(self, other):
+        """ Return the index of the first move where self and other differ,
+        the length of the shorter if it is a prefix of the other, or None
+        if they have the same moves.
+
+        Each MoveSequence keeps a hash of every prefix of whole chunks of
+        its moves, made the first time it is compared, so only the chunk
+        where the two first differ is compared move by move, and the
+        chunk is found by a binary search over the prefix hashes.
+
+        @param MoveSequence self:
+        @param MoveSequence other:
+        @rtype: int | None
+
+        >>> ms = MoveSequence([(0, 1), (0, 2), (1, 2)])
+        >>> ms.first_difference(MoveSequence([(0, 1), (0, 2), (2, 1)]))
+        2
+        >>> ms.first_difference(ms[:2]), ms.first_difference(ms[:])
+        (2, None)
+        >>> ms.first_difference(MoveSequence([(0, 1), (0, 2), (1, 2000)]))
+        2
+        """
+        length = min(self.length(), other.length())
+        chunks = length // _DIGEST_CHUNK
+        (digests, other_digests) = (self._prefix_digests(chunks),
+                                    other._prefix_digests(chunks))
+        # the first whole chunk where the prefixes differ, or chunks
+        (low, high) = (0, chunks)
+        while low < high:
+            middle = (low + high) // 2
+            if digests[middle] == other_digests[middle]:
+                low = middle + 1
+            else:
+                high = middle
+        start = low * _DIGEST_CHUNK
+        stop = min(start + _DIGEST_CHUNK, length) if low < chunks else length
+        for (index, (move, other_move)) in enumerate(
+                zip(self[start:stop], other[start:stop]), start):
+            if move != other_move:
+                return index
+        if self.length() != other.length():
+            return length
+        return None
+
+    def _prefix_digests(self, chunks):
+        """ Return the hashes of the moves in the first 1, 2, ...,
+        chunks whole chunks of self, making those not yet kept.
+
+        @param MoveSequence self:
+        @param int chunks:
+        @rtype: list[bytes]
+        """
+        digests = self._digests
+        for chunk in range(len(digests), chunks):
+            start = chunk * _DIGEST_CHUNK
+            digests.append(hashlib.blake2b(
+                (digests[-1] if digests else b'') + _canonical_moves(
+                    self[start:start + _DIGEST_CHUNK]),
+                digest_size=16).digest())
+        return digests
+
+    def find_illegal_move(self, number_of_stools, number_of_cheeses):
+        """ Return the index of the first move in self that is illegal when
+        the game starts with number_of_cheeses on the first of
+        number_of_stools stools, or None if every move is legal.
+
+        This checks the moves in one pass over stacks of cheese sizes,
+        without building a TOAHModel.
+
+        @param MoveSequence self:
+        @param int number_of_stools:
+        @param int number_of_cheeses:
+        @rtype: int | None
+
+        >>> MoveSequence([(0, 1), (0, 2), (1, 2)]).find_illegal_move(3, 2)
+        >>> MoveSequence([(0, 1), (0, 1)]).find_illegal_move(3, 2)
+        1
+        >>> MoveSequence([(0, 3)]).find_illegal_move(3, 2)
+        0
+        """
+        stools = [[] for stool in range(number_of_stools)]
+        if number_of_stools > 0:
+            stools[0] = list(range(number_of_cheeses, 0, -1))
+        return self.replay_on_stacks(stools)
+
+    def replay_on_stacks(self, stools):
+        """ Make the moves in self on stools, each a list of the sizes of
+        the cheeses on it from the bottom up, up to the first illegal one,
+        and return its index in self, or None if every move is legal.
+
+        @param MoveSequence self:
+        @param list[list[int]] stools:
+        @rtype: int | None
+
+        >>> stools = [[2], [], [1]]
+        >>> MoveSequence([(2, 1), (0, 2), (0, 1)]).replay_on_stacks(stools)
+        2
+        >>> stools
+        [[], [1], [2]]
         """
-        return isinstance(other, MoveSequence) and self._moves == other._moves
+        number_of_stools = len(stools)
+        for (index, (src_stool, dest_stool)) in enumerate(self):
+            if not (0 <= src_stool < number_of_stools and
+                    0 <= dest_stool < number_of_stools and
+                    src_stool != dest_stool and stools[src_stool]):
+                return index
+            dest = stools[dest_stool]
+            if dest and dest[-1] < stools[src_stool][-1]:
+                return index
+            dest.append(stools[src_stool].pop())
+        return None
 
     def generate_toah_model(self, number_of_stools, number_of_cheeses):
         """ Construct TOAHModel from number_of_stools and number_of_cheeses
@@ -487,11 +2163,301 @@ class MoveSequence(object):
         """
         model = TOAHModel(number_of_stools)
         model.fill_first_stool(number_of_cheeses)
-        for move in self._moves:
-            model.move(move[0], move[1])
+        index = model.apply_moves(self, atomic=False)
+        if index is not None:
+            raise IllegalMoveError("Move {0} is illegal.".format(index))
         return model
 
 
+class GrammarMoveSequence(MoveSequence):
+    """ A MoveSequence stored as a grammar instead of move by move.
+
+    Rule r > 0 of the grammar is a list of parts, each a (rule, stools)
+    pair: the moves of that rule, an earlier one, with each stool s in
+    them replaced by stools[s]. Rule 0 is the single move from stool 0 to
+    stool 1. The sequence is its pieces, also (rule, stools) pairs, in
+    order, followed by any moves added to it.
+
+    A solution that repeats the same sub-solution on different stools,
+    such as a tour, needs far fewer rules than moves. length() is O(1),
+    get_move and slicing descend through the rules, and iterating expands
+    the moves as it goes. Short rules are expanded once and kept.
+    MoveSequence(grammar_move_seq) makes an ordinary, packed, copy.
+    """
+
+    # rules with at most this many moves are kept expanded
+    _EXPANDED_LENGTH = 256
+
+    def __init__(self, rules, pieces):
+        """ Create a new GrammarMoveSequence self of pieces, with rules.
+
+        Raise ValueError if a rule uses a rule that is not an earlier one,
+        or a rule is given fewer stools than its moves use.
+
+        @param GrammarMoveSequence self:
+        @param list[list[tuple[int, tuple[int]]]] rules:
+            parts of each rule; rules[0] is not used
+        @param list[tuple[int, tuple[int]]] pieces:
+        @rtype: None
+
+        >>> rules = [None, [(0, (0, 2)), (0, (0, 1)), (0, (2, 1))]]
+        >>> ms = GrammarMoveSequence(rules, [(1, (0, 2, 1)), (0, (2, 0))])
+        >>> list(ms)
+        [(0, 1), (0, 2), (1, 2), (2, 0)]
+        >>> GrammarMoveSequence(rules, [(1, (0, 2))])
+        Traceback (most recent call last):
+        ...
+        ValueError: A piece gives rule 1, which uses 3 stools, stools (0, 2)
+        """
+        self._rules = rules
+        # number of moves of each rule, where each of its parts starts,
+        # and its moves, if it is short enough to keep them
+        self._lengths = [1]
+        self._starts = [None]
+        self._expanded = {}
+        # number of stools the moves of each rule use
+        used = [2]
+        for (rule, parts) in enumerate(rules[1:], 1):
+            starts = [0]
+            last = -1
+            for (part, stools) in parts:
+                if not 0 <= part < rule:
+                    raise ValueError("Rule {0} uses rule {1}, which is not "
+                                     "an earlier rule".format(rule, part))
+                given = stools[:used[part]]
+                if len(given) < used[part] or min(given, default=0) < 0:
+                    raise ValueError("Rule {0} gives rule {1}, which uses {2} "
+                                     "stools, stools {3}".format(
+                                         rule, part, used[part], stools))
+                last = max(last, max(given, default=-1))
+                starts.append(starts[-1] + self._lengths[part])
+            self._lengths.append(starts.pop())
+            self._starts.append(starts)
+            used.append(last + 1)
+        for (rule, stools) in pieces:
+            given = stools[:used[rule]]
+            if len(given) < used[rule] or min(given, default=0) < 0:
+                raise ValueError("A piece gives rule {0}, which uses {1} "
+                                 "stools, stools {2}".format(
+                                     rule, used[rule], stools))
+        self._set_pieces(pieces)
+        self._tail = MoveSequence([])
+        self._digests = []
+
+    def _set_pieces(self, pieces):
+        """ Make pieces the pieces of self's grammar.
+
+        @param GrammarMoveSequence self:
+        @param list[tuple[int, tuple[int]]] pieces:
+        @rtype: None
+        """
+        self._pieces = pieces
+        self._piece_starts = []
+        self._grammar_length = 0
+        for (rule, _) in pieces:
+            self._piece_starts.append(self._grammar_length)
+            self._grammar_length += self._lengths[rule]
+
+    def __getstate__(self):
+        """ Return the state to pickle.
+
+        @param GrammarMoveSequence self:
+        @rtype: dict
+        """
+        state = self.__dict__.copy()
+        state['_expanded'] = {}
+        return state
+
+    def get_buffer(self):
+        """ Return None: self's moves are not packed.
+
+        @param GrammarMoveSequence self:
+        @rtype: None
+        """
+        return None
+
+    def get_move(self, i):
+        """ Return the move at position i in self.
+
+        @param GrammarMoveSequence self:
+        @param int i:
+        @rtype: tuple[int]
+
+        >>> rules = [None, [(0, (0, 2)), (0, (0, 1)), (0, (2, 1))]]
+        >>> ms = GrammarMoveSequence(rules, [(1, (3, 0, 1))])
+        >>> ms.get_move(1), ms.get_move(-1)
+        ((3, 0), (1, 0))
+        """
+        if i < 0:
+            i += self.length()
+        if not 0 <= i < self.length():
+            raise IndexError("move index out of range")
+        if i >= self._grammar_length:
+            return self._tail.get_move(i - self._grammar_length)
+        piece = bisect_right(self._piece_starts, i) - 1
+        i -= self._piece_starts[piece]
+        (rule, stools) = self._pieces[piece]
+        while rule:
+            part = bisect_right(self._starts[rule], i) - 1
+            i -= self._starts[rule][part]
+            (rule, part_stools) = self._rules[rule][part]
+            stools = tuple([stools[stool] for stool in part_stools])
+        return (stools[0], stools[1])
+
+    def __getitem__(self, index):
+        """ Return the move at position index, or a GrammarMoveSequence of
+        the moves in slice index, which shares self's rules.
+
+        @param GrammarMoveSequence self:
+        @param int|slice index:
+        @rtype: tuple[int] | GrammarMoveSequence
+
+        >>> rules = [None, [(0, (0, 2)), (0, (0, 1)), (0, (2, 1))]]
+        >>> ms = GrammarMoveSequence(rules, [(1, (0, 1, 2)), (1, (1, 2, 0))])
+        >>> list(ms[2:4])
+        [(2, 1), (1, 0)]
+        """
+        if not isinstance(index, slice):
+            return self.get_move(index)
+        (start, stop, step) = index.indices(self.length())
+        if step != 1:
+            raise ValueError("MoveSequence slices must be contiguous")
+        part = copy(self)
+        part._set_pieces(self._cover(start, stop))
+        part._digests = []
+        part._tail = self._tail[max(start - self._grammar_length, 0):
+                                max(stop - self._grammar_length, 0)]
+        return part
+
+    def _cover(self, start, stop):
+        """ Return the fewest pieces, as (rule, stools) pairs, whose moves
+        are the moves from start up to stop of self's grammar.
+
+        @param GrammarMoveSequence self:
+        @param int start:
+        @param int stop:
+        @rtype: list[tuple[int, tuple[int]]]
+        """
+        pieces = []
+        pending = list(zip(self._pieces, self._piece_starts))
+        pending.reverse()
+        while pending:
+            ((rule, stools), begin) = pending.pop()
+            end = begin + self._lengths[rule]
+            if end <= start or begin >= stop:
+                continue
+            elif start <= begin and end <= stop:
+                pieces.append((rule, stools))
+                continue
+            for ((part, part_stools), part_start) in reversed(list(zip(
+                    self._rules[rule], self._starts[rule]))):
+                pending.append(((part, tuple([stools[stool]
+                                              for stool in part_stools])),
+                                begin + part_start))
+        return pieces
+
+    def __iter__(self):
+        """ Return an iterator over the moves in self.
+
+        @param GrammarMoveSequence self:
+        @rtype: iterator[tuple[int]]
+        """
+        return chain(self._expand(self._pieces), self._tail)
+
+    def _expand(self, pieces):
+        """ Yield the moves of pieces, in order.
+
+        @param GrammarMoveSequence self:
+        @param list[tuple[int, tuple[int]]] pieces:
+        @rtype: iterator[tuple[int]]
+        """
+        pending = list(reversed(pieces))
+        while pending:
+            (rule, stools) = pending.pop()
+            if not rule:
+                yield (stools[0], stools[1])
+                continue
+            expanded = self._expanded.get(rule)
+            if expanded is None and (self._lengths[rule] <=
+                                     self._EXPANDED_LENGTH):
+                # the parts are shorter, so this recursion is shallow
+                expanded = array('L', chain.from_iterable(
+                    self._expand(self._rules[rule])))
+                self._expanded[rule] = expanded
+            if expanded is not None:
+                labels = iter(expanded)
+                for (src_stool, dest_stool) in zip(labels, labels):
+                    yield (stools[src_stool], stools[dest_stool])
+                continue
+            for (part, part_stools) in reversed(self._rules[rule]):
+                pending.append((part, tuple([stools[stool]
+                                             for stool in part_stools])))
+
+    def add_move(self, src_stool, dest_stool):
+        """ Add move from src_stool to dest_stool to self.
+
+        @param GrammarMoveSequence self:
+        @param int src_stool:
+        @param int dest_stool:
+        @rtype: None
+        """
+        self._tail.add_move(src_stool, dest_stool)
+
+    def add_moves(self, moves):
+        """ Add every (src_stool, dest_stool) move in moves to self, in
+        order.
+
+        @param GrammarMoveSequence self:
+        @param iterable[tuple[int]] moves:
+        @rtype: None
+        """
+        self._tail.add_moves(moves)
+
+    def length(self):
+        """ Return number of moves in self.
+
+        @param GrammarMoveSequence self:
+        @rtype: int
+        """
+        return self._grammar_length + self._tail.length()
+
+    def truncate(self, length):
+        """ Remove the moves in self after the first length.
+
+        @param GrammarMoveSequence self:
+        @param int length:
+        @rtype: None
+
+        >>> rules = [None, [(0, (0, 2)), (0, (0, 1)), (0, (2, 1))]]
+        >>> ms = GrammarMoveSequence(rules, [(1, (0, 1, 2))])
+        >>> ms.truncate(2)
+        >>> list(ms)
+        [(0, 2), (0, 1)]
+        """
+        del self._digests[length // _DIGEST_CHUNK:]
+        if length >= self._grammar_length:
+            self._tail.truncate(length - self._grammar_length)
+        else:
+            self._set_pieces(self._cover(0, length))
+            self._tail = MoveSequence([])
+
+    def __eq__(self, other):
+        """ Does self have the same moves as other?
+
+        @type self: GrammarMoveSequence
+        @type other: MoveSequence
+        @rtype: bool
+        """
+        if not isinstance(other, MoveSequence):
+            return False
+        elif (isinstance(other, GrammarMoveSequence) and
+              self._rules is other._rules and
+              self._pieces == other._pieces and self._tail == other._tail):
+            return True
+        return (self.length() == other.length() and
+                self.first_difference(other) is None)
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(verbose=True)
@@ -0,0 +1,416 @@
+"""
+functions to find provably shortest TOAH solutions by searching the space
+of configurations.
+
+A configuration is packed into one int: the stool index of the cheese of
+size s takes the bits from (s - 1) * b up to s * b, where b is the number
+of bits needed for a stool index.
+"""
+
+
+# Copyright 2013, 2014, 2017 Gary Baumgartner, Danny Heap, Dustin Wehr,
+# Bogdan Simion, Jacqueline Smith, Dan Zingaro
+# Distributed under the terms of the GNU General Public License.
+#
+# This file is part of Assignment 1, CSC148, Winter 2017.
+#
+# This is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This file is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this file.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import heapq
+import time
+from toah_model import MoveSequence
+from tour import min_number_of_moves
+
+# Marks the start configuration in a table of the moves that reached each
+# configuration; every other entry is 0 (not reached) or src * k + dst + 1.
+_START = 255
+
+# The smallest cheeses packed into this many bits index a table of the top
+# cheese on each stool; the tables are built on first use.
+_LOW_TOP_BITS = 16
+_LOW_TOPS = {}
+
+
+def stool_bits(number_of_stools):
+    """ Return the number of bits used for each cheese's stool index.
+
+    @type number_of_stools: int
+    @rtype: int
+
+    >>> stool_bits(4), stool_bits(5)
+    (2, 3)
+    """
+    return max(1, (number_of_stools - 1).bit_length())
+
+
+def encode_locations(locations, bits):
+    """ Return locations (the stool of each cheese, smallest first) packed
+    into an int with bits bits per cheese.
+
+    @type locations: list[int]
+    @type bits: int
+    @rtype: int
+
+    >>> encode_locations([3, 0, 1], 2)
+    19
+    """
+    state = 0
+    for (cheese, stool) in enumerate(locations):
+        state |= stool << (cheese * bits)
+    return state
+
+
+def decode_locations(state, number_of_cheeses, bits):
+    """ Return the stool of each cheese, smallest first, packed in state.
+
+    @type state: int
+    @type number_of_cheeses: int
+    @type bits: int
+    @rtype: list[int]
+
+    >>> decode_locations(19, 3, 2)
+    [3, 0, 1]
+    """
+    mask = (1 << bits) - 1
+    return [(state >> (cheese * bits)) & mask
+            for cheese in range(number_of_cheeses)]
+
+
+def _low_tops(number_of_stools, bits, chunk):
+    """ Return a table giving, for every packing of the chunk smallest
+    cheeses, the index of the top cheese on each stool, or None for a stool
+    none of them are on.
+
+    @type number_of_stools: int
+    @type bits: int
+    @type chunk: int
+    @rtype: list[tuple[int | None]]
+
+    >>> _low_tops(3, 2, 2)[0b0100]
+    (0, 1, None)
+    """
+    key = (number_of_stools, bits, chunk)
+    if key not in _LOW_TOPS:
+        mask = (1 << bits) - 1
+        table = []
+        for low in range(1 << (bits * chunk)):
+            tops = [None] * (mask + 1)
+            for cheese in range(chunk - 1, -1, -1):
+                tops[(low >> (cheese * bits)) & mask] = cheese
+            table.append(tuple(tops[:number_of_stools]))
+        _LOW_TOPS[key] = table
+    return _LOW_TOPS[key]
+
+
+def _top_cheeses(state, number_of_cheeses, number_of_stools, bits):
+    """ Return the index (0 for the smallest) of the top cheese on each
+    stool in state, or number_of_cheeses for an empty stool, as a sequence
+    not to be changed.
+
+    The smallest cheeses are looked up in a table, and the rest are only
+    scanned while some stool has not been found.
+
+    @type state: int
+    @type number_of_cheeses: int
+    @type number_of_stools: int
+    @type bits: int
+    @rtype: tuple[int] | list[int]
+
+    >>> list(_top_cheeses(19, 3, 4, 2))
+    [1, 2, 3, 0]
+    """
+    chunk = min(number_of_cheeses, _LOW_TOP_BITS // bits)
+    tops = _low_tops(number_of_stools, bits, chunk)[
+        state & ((1 << (bits * chunk)) - 1)]
+    missing = tops.count(None)
+    if not missing:
+        return tops
+    tops = list(tops)
+    mask = (1 << bits) - 1
+    for cheese in range(chunk, number_of_cheeses):
+        stool = (state >> (cheese * bits)) & mask
+        if tops[stool] is None:
+            tops[stool] = cheese
+            missing -= 1
+            if not missing:
+                return tops
+    return [number_of_cheeses if cheese is None else cheese
+            for cheese in tops]
+
+
+def _next_states(state, number_of_cheeses, number_of_stools, bits):
+    """ Return (src, dst, next state) for every legal move from state.
+
+    @type state: int
+    @type number_of_cheeses: int
+    @type number_of_stools: int
+    @type bits: int
+    @rtype: list[tuple[int]]
+
+    >>> _next_states(19, 3, 4, 2)
+    [(0, 1, 23), (0, 2, 27), (1, 2, 35), (3, 0, 16), (3, 1, 17), (3, 2, 18)]
+    """
+    tops = _top_cheeses(state, number_of_cheeses, number_of_stools, bits)
+    return [(src, dst, state ^ ((src ^ dst) << (cheese * bits)))
+            for (src, cheese) in enumerate(tops) if cheese < number_of_cheeses
+            for (dst, other) in enumerate(tops) if other > cheese]
+
+
+def _undo_move(state, src, dst, number_of_cheeses, number_of_stools, bits):
+    """ Return the state before the move from src to dst that led to state.
+
+    @type state: int
+    @type src: int
+    @type dst: int
+    @type number_of_cheeses: int
+    @type number_of_stools: int
+    @type bits: int
+    @rtype: int
+    """
+    cheese = _top_cheeses(state, number_of_cheeses, number_of_stools,
+                          bits)[dst]
+    return state ^ ((src ^ dst) << (cheese * bits))
+
+
+def _rebuild_moves(reached_by, goal, number_of_cheeses, number_of_stools,
+                   bits):
+    """ Return the MoveSequence that reached goal, undoing the moves
+    recorded in reached_by (indexed by packed configuration) back to the
+    configuration marked _START.
+
+    @type reached_by: bytearray | dict[int, int]
+    @type goal: int
+    @type number_of_cheeses: int
+    @type number_of_stools: int
+    @type bits: int
+    @rtype: MoveSequence
+    """
+    moves = []
+    state = goal
+    while reached_by[state] != _START:
+        (src, dst) = divmod(reached_by[state] - 1, number_of_stools)
+        moves.append((src, dst))
+        state = _undo_move(state, src, dst, number_of_cheeses,
+                           number_of_stools, bits)
+    moves.reverse()
+    return MoveSequence(moves)
+
+
+def _next_frontier(frontier, reached_by, number_of_cheeses,
+                   number_of_stools, bits):
+    """ Return the configurations one legal move from those in frontier
+    that are not yet in reached_by, recording in reached_by the move that
+    reached each one.
+
+    @type frontier: list[int]
+    @type reached_by: bytearray
+    @type number_of_cheeses: int
+    @type number_of_stools: int
+    @type bits: int
+    @rtype: list[int]
+    """
+    moves = [(src, dst, src * number_of_stools + dst + 1)
+             for src in range(number_of_stools)
+             for dst in range(number_of_stools) if src != dst]
+    next_frontier = []
+    for state in frontier:
+        tops = _top_cheeses(state, number_of_cheeses, number_of_stools, bits)
+        for (src, dst, move) in moves:
+            cheese = tops[src]
+            next_state = state ^ ((src ^ dst) << (cheese * bits))
+            # an empty stool's top is number_of_cheeses, so none moves off
+            if cheese < tops[dst] and not reached_by[next_state]:
+                reached_by[next_state] = move
+                next_frontier.append(next_state)
+    return next_frontier
+
+
+def bfs_solve(model, dest_stool=None):
+    """
+    Return a shortest MoveSequence that takes model's configuration to one
+    with every cheese on dest_stool (the last stool by default), or None if
+    there is none.
+
+    Every configuration is visited at most once, breadth first, recording
+    the move that reached it in a bytearray indexed by the packed
+    configuration, so memory is one byte per possible configuration:
+    4 ** n bytes for four stools. This is meant for checking other solvers
+    on small instances.
+
+    @type model: TOAHModel
+    @type dest_stool: int | None
+    @rtype: MoveSequence | None
+
+    >>> from toah_model import TOAHModel
+    >>> model = TOAHModel(4)
+    >>> model.fill_first_stool(6)
+    >>> bfs_solve(model).length()
+    17
+    >>> model = TOAHModel(3)
+    >>> model.fill_first_stool(2)
+    >>> bfs_solve(model, 1).get_move(0)
+    (0, 2)
+    """
+    number_of_stools = model.get_number_of_stools()
+    number_of_cheeses = model.get_number_of_cheeses()
+    if number_of_stools * number_of_stools >= _START:
+        raise ValueError("Too many stools for bfs_solve.")
+    if dest_stool is None:
+        dest_stool = number_of_stools - 1
+    bits = stool_bits(number_of_stools)
+    start = encode_locations(model.get_cheese_locations(), bits)
+    goal = encode_locations([dest_stool] * number_of_cheeses, bits)
+
+    reached_by = bytearray(1 << (bits * number_of_cheeses))
+    reached_by[start] = _START
+    frontier = [start]
+    while frontier and not reached_by[goal]:
+        frontier = _next_frontier(frontier, reached_by, number_of_cheeses,
+                                  number_of_stools, bits)
+    if not reached_by[goal]:
+        return None
+
+    return _rebuild_moves(reached_by, goal, number_of_cheeses,
+                          number_of_stools, bits)
+
+
+def _lower_bound(state, number_of_cheeses, bits, dest_stool, tower_moves):
+    """ Return a lower bound on the number of moves from state to every
+    cheese on dest_stool.
+
+    Let L be the largest cheese not on dest_stool. L moves at least once,
+    every smaller cheese on L's stool or on dest_stool moves at least twice
+    (it has to leave for L to move, and arrive after L), and every other
+    smaller cheese at least once. If tower_moves is given, the smallest m
+    cheeses stacked on one stool other than dest_stool need at least
+    tower_moves[m] moves as well.
+
+    @type state: int
+    @type number_of_cheeses: int
+    @type bits: int
+    @type dest_stool: int
+    @type tower_moves: list[int] | None
+    @rtype: int
+
+    >>> _lower_bound(0b000000, 3, 2, 3, None)
+    5
+    >>> _lower_bound(0b000000, 3, 2, 3, [0, 1, 3, 5])
+    5
+    >>> _lower_bound(0b111111, 3, 2, 3, None)
+    0
+    """
+    locations = decode_locations(state, number_of_cheeses, bits)
+    largest = number_of_cheeses - 1
+    while largest >= 0 and locations[largest] == dest_stool:
+        largest -= 1
+    if largest < 0:
+        return 0
+    stool = locations[largest]
+    bound = 1
+    for location in locations[:largest]:
+        bound += 2 if location == stool or location == dest_stool else 1
+    if tower_moves is not None and locations[0] != dest_stool:
+        height = 1
+        while (height < number_of_cheeses and
+               locations[height] == locations[0]):
+            height += 1
+        bound = max(bound, tower_moves[height])
+    return bound
+
+
+def astar_solve(model, dest_stool=None, max_states=1000000,
+                time_limit=None):
+    """
+    Return a shortest MoveSequence that takes model's configuration, which
+    may be any legal one, to one with every cheese on dest_stool (the last
+    stool by default), or None if there is none or the search runs out of
+    its budget first.
+
+    The search is A* with an admissible lower bound. With at most four
+    stools the bound includes the Frame-Stewart length of the tower of
+    smallest cheeses, which is provably optimal there. At most max_states
+    configurations are kept and, if time_limit is given, the search gives
+    up after that many seconds.
+
+    @type model: TOAHModel
+    @type dest_stool: int | None
+    @type max_states: int
+    @type time_limit: float | None
+    @rtype: MoveSequence | None
+
+    >>> from toah_model import TOAHModel
+    >>> model = TOAHModel(4)
+    >>> model.fill_stools([1, 3, 0, 0, 2, 3, 3])
+    >>> astar_solve(model).length()
+    10
+    >>> model = TOAHModel(4)
+    >>> model.fill_first_stool(20)
+    >>> astar_solve(model, max_states=1000) is None
+    True
+    """
+    number_of_stools = model.get_number_of_stools()
+    number_of_cheeses = model.get_number_of_cheeses()
+    if dest_stool is None:
+        dest_stool = number_of_stools - 1
+    if number_of_stools <= 4:
+        tower_moves = [min_number_of_moves(height, number_of_stools)
+                       for height in range(number_of_cheeses + 1)]
+    else:
+        tower_moves = None
+    bits = stool_bits(number_of_stools)
+    start = encode_locations(model.get_cheese_locations(), bits)
+    goal = encode_locations([dest_stool] * number_of_cheeses, bits)
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+
+    # fewest moves found to each configuration, and the last of them
+    moves_to = {start: 0}
+    reached_by = {start: _START}
+    heap = [(_lower_bound(start, number_of_cheeses, bits, dest_stool,
+                          tower_moves), 0, start)]
+    expanded = 0
+    while heap:
+        (_, moves, state) = heapq.heappop(heap)
+        moves = -moves
+        if moves > moves_to[state]:
+            continue
+        if state == goal:
+            return _rebuild_moves(reached_by, goal, number_of_cheeses,
+                                  number_of_stools, bits)
+        expanded += 1
+        if len(moves_to) > max_states or (
+                time_limit is not None and expanded % 1024 == 0 and
+                time.perf_counter() > deadline):
+            return None
+        for (src, dst, next_state) in _next_states(
+                state, number_of_cheeses, number_of_stools, bits):
+            if moves + 1 < moves_to.get(next_state, moves + 2):
+                moves_to[next_state] = moves + 1
+                reached_by[next_state] = src * number_of_stools + dst + 1
+                # ties go to the deeper configuration
+                heapq.heappush(heap, (
+                    moves + 1 + _lower_bound(next_state, number_of_cheeses,
+                                             bits, dest_stool, tower_moves),
+                    -(moves + 1), next_state))
+    return None
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
+    # Leave lines below to see what python_ta checks.
+    # File toahsearch_pyta.txt must be in same folder.
+    import python_ta
+    python_ta.check_all(config="toahsearch_pyta.txt")
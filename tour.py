@@ -27,7 +27,95 @@ functions to run TOAH tours.
 # you may want to use time.sleep(DELAY_BETWEEN_MOVES) in your
 # solution for 'if __name__ == "main":'
 import time
-from toah_model import TOAHModel
+from collections import OrderedDict
+from toah_model import TOAHModel, TOAHRenderer, GrammarMoveSequence
+
+
+# Frame-Stewart cost tables shared by move_n, generate_min_move_i and the
+# tour functions, keyed by number of stools: _MIN_MOVES[k][n] is the fewest
+# moves for n cheeses on k stools and _MIN_MOVE_I[k][n] the value of i that
+# achieves it. Each table is built bottom-up and only ever extended.
+_MIN_MOVES = {4: [0, 1]}
+_MIN_MOVE_I = {4: [0, 0]}
+
+# Sub-tours of at most TEMPLATE_MOVES moves are solved once, on stools 0,
+# 1, 2, ..., and kept as templates, the source and destination stool of
+# each move in turn as bytes, keyed by (n, number_of_stools). The least
+# recently used are dropped once they take over TEMPLATE_BYTES in all.
+TEMPLATE_MOVES = 1 << 12
+TEMPLATE_BYTES = 1 << 20
+_TEMPLATES = OrderedDict()
+# the most cheeses kept as a template, by (number_of_stools, TEMPLATE_MOVES)
+_TEMPLATE_LIMITS = {}
+
+
+def _extend_move_table(n, number_of_stools):
+    """
+    Extend the Frame-Stewart cost table for number_of_stools (at least 4)
+    so it covers n cheeses.
+
+    The cost of a split, 2 * moves[n - i] + (moves of i cheeses on one
+    stool fewer), is convex in i and its smallest minimizer never
+    decreases as n grows, so the search for each new n starts at the
+    previous best i.
+
+    @type n: int
+    @type number_of_stools: int
+    @rtype: None
+    """
+    moves = _MIN_MOVES.setdefault(number_of_stools, [0, 1])
+    splits = _MIN_MOVE_I.setdefault(number_of_stools, [0, 0])
+    if number_of_stools == 4:
+        fewer = [2 ** i - 1 for i in range(n + 1)]
+    else:
+        min_number_of_moves(n, number_of_stools - 1)
+        fewer = _MIN_MOVES[number_of_stools - 1]
+    for m in range(len(moves), n + 1):
+        i = max(splits[m - 1], 1)
+        best = 2 * moves[m - i] + fewer[i]
+        while i + 1 < m:
+            cost = 2 * moves[m - i - 1] + fewer[i + 1]
+            if cost >= best:
+                break
+            i += 1
+            best = cost
+        moves.append(best)
+        splits.append(i)
+
+
+def min_number_of_moves(n, number_of_stools=4):
+    """
+    Return the number of moves the number_of_stools tour takes for n
+    cheeses, without generating any of them.
+
+    Raise ValueError if n cheeses cannot be moved with number_of_stools.
+
+    @type n: int
+    @type number_of_stools: int
+    @rtype: int
+    >>> min_number_of_moves(5)
+    13
+    >>> min_number_of_moves(64)
+    18433
+    >>> min_number_of_moves(3000) > 2 ** 70
+    True
+    >>> min_number_of_moves(10, 3)
+    1023
+    >>> min_number_of_moves(30, 6)
+    169
+    """
+    if n <= 0:
+        return 0
+    elif number_of_stools == 3:
+        return 2 ** n - 1
+    elif number_of_stools < 3:
+        if n == 1 and number_of_stools == 2:
+            return 1
+        raise ValueError("Cannot move {0} cheeses with {1} stools."
+                         .format(n, number_of_stools))
+    if n >= len(_MIN_MOVES.get(number_of_stools, ())):
+        _extend_move_table(n, number_of_stools)
+    return _MIN_MOVES[number_of_stools][n]
 
 
 def move_n(n, i):
@@ -43,41 +131,35 @@ def move_n(n, i):
     if n == 1:
         return 1
     else:
-        return 2 * move_n(n - i, generate_min_move_i(n - i)) + 2 ** i - 1
+        return 2 * min_number_of_moves(n - i) + 2 ** i - 1
 
 
-def generate_min_move_i(n):
+def generate_min_move_i(n, number_of_stools=4):
     """
     Return the value of i to get the minimum number of moves
     to move cheeses to the second stool from the source stool.
 
     @type n: int
+    @type number_of_stools: int
     @rtype: int
     >>> generate_min_move_i(5)
     2
     >>> generate_min_move_i(15)
     5
+    >>> generate_min_move_i(30, 6)
+    15
     """
     # if the number of cheeses is less than or equal to 1,
     # return 0 since there is no moves needed and i = 0.
     if n <= 1:
         return 0
-    # if there are 2 cheeses, return 1 since
-    # there is one move needed and i = 1.
-    elif n == 2:
+    # with three stools only the bottom cheese is moved on its own.
+    elif number_of_stools == 3:
         return 1
-    # if there are more than 2 cheeses (3, 4, 5, 6, ...),
-    # calculate the value of i.
-    # iterate the value of i from 1 to n-i to get (move_n())
-    # and when it's the minimum number of
-    # moves (ex. if moves_i= [(7, 1), (5, 2)], then 2),
-    # return the value of i
-    else:
-        moves_i = []
-        for i in range(1, n):
-            moves_i.append((move_n(n, i), i))
-        min_moves_i = min(moves_i)
-        return min_moves_i[1]
+    # otherwise look up the value of i that gives the minimum number
+    # of moves (ties go to the smaller i) in the shared table.
+    min_number_of_moves(n, number_of_stools)
+    return _MIN_MOVE_I[number_of_stools][n]
 
 
 def move_three_stools(model, n, stool):
@@ -90,14 +172,8 @@ def move_three_stools(model, n, stool):
     @type stool: list[int]
     @rtype: None
     """
-    if n <= 0: # iterate until the number of cheeses becomes 0 (recursion)
-        return
-    else:
-        move_three_stools(model, n-1, [stool[0], stool[2], stool[1]])
-
-        model.move(stool[0], stool[1])
-        move_three_stools(model, n-1, [stool[2], stool[1], stool[0]])
-        return
+    for (src_stool, dst_stool) in _iter_three_stool_moves(n, stool):
+        model.move(src_stool, dst_stool)
 
 
 def move_four_stools(model, n, stool):
@@ -109,24 +185,444 @@ def move_four_stools(model, n, stool):
     @type stool: list[int]
     @rtype: None
     """
-    if n <= 0:
-        return
-    elif n == 1: # after the iteration of the codes, move the last cheese
+    for (src_stool, dst_stool) in iter_tour_moves(n, stool):
+        model.move(src_stool, dst_stool)
+
+
+def move_k_stools(model, n, stool):
+    """
+    Move n cheeses from stool[0] to stool[1] using every stool in stool,
+    splitting off the optimal i at each level like move_four_stools.
+
+    @type model: TOAHModel
+    @type n: int
+    @type stool: list[int]
+    @rtype: None
+
+    >>> model = TOAHModel(6)
+    >>> model.fill_first_stool(12)
+    >>> move_k_stools(model, 12, [0, 5, 1, 2, 3, 4])
+    >>> model.number_of_moves() == min_number_of_moves(12, 6)
+    True
+    >>> model.get_top_cheese(5).size
+    1
+    """
+    for (src_stool, dst_stool) in iter_tour_moves(n, stool):
+        model.move(src_stool, dst_stool)
+
 
-        model.move(stool[0], stool[1])
+def _iter_three_stool_moves(n, stool):
+    """
+    Yield the moves of the recursive three-stool solution for n cheeses
+    from stool[0] to stool[1], without recursion.
+
+    Move m (counting from 1) moves the cheese whose index (0 for the
+    smallest) is the number of trailing zeros of m, and every cheese always
+    steps the same way around the three stools: forwards if it is an
+    even number of sizes below the largest, backwards otherwise. A binary
+    counter kept as a list finds the trailing zeros in amortized O(1).
+
+    @type n: int
+    @type stool: list[int]
+    @rtype: iterator[tuple[int]]
+
+    >>> list(_iter_three_stool_moves(2, [0, 2, 1]))
+    [(0, 1), (0, 2), (1, 2)]
+    """
+    # the three moves each cheese cycles through, and where it is in them
+    cycles = []
+    for cheese in range(n):
+        if (n - 1 - cheese) % 2 == 0:
+            order = (stool[0], stool[1], stool[2])
+        else:
+            order = (stool[0], stool[2], stool[1])
+        cycles.append(((order[0], order[1]), (order[1], order[2]),
+                       (order[2], order[0])))
+    positions = [0] * n
+    counter = [False] * (n + 1)
+    while True:
+        cheese = 0
+        while counter[cheese]:
+            counter[cheese] = False
+            cheese += 1
+        if cheese == n:
+            return
+        counter[cheese] = True
+        position = positions[cheese]
+        positions[cheese] = (position + 1) % 3
+        yield cycles[cheese][position]
+
+
+def iter_tour_moves(n, stool):
+    """
+    Yield, in solution order, the (src, dst) moves that take n cheeses
+    from stool[0] to stool[1] using every stool in stool.
+
+    The moves are the ones the recursive Frame-Stewart solution makes,
+    but they are produced from an explicit stack of pending sub-tours, so
+    there is no recursion limit on n. Nothing is applied to a model or
+    recorded, and only the pending sub-tours (O(n) of them) and the
+    bounded template cache are kept in memory.
+
+    @type n: int
+    @type stool: list[int]
+    @rtype: iterator[tuple[int]]
+
+    >>> list(iter_tour_moves(2, [0, 2, 1]))
+    [(0, 1), (0, 2), (1, 2)]
+    >>> moves = iter_tour_moves(40, [0, 3, 1, 2])
+    >>> next(moves)
+    (0, 3)
+    >>> next(iter_tour_moves(50000, [0, 2, 1]))
+    (0, 1)
+    >>> list(iter_tour_moves(1, [0, 300, 1]))
+    [(0, 300)]
+    """
+    if len(stool) > 256 or not all(0 <= s < 256 for s in stool):
+        yield from _iter_tour_moves(n, stool)
         return
-    else:
-        # get the value of i for the minimum of moves
-        i = generate_min_move_i(n)
+    for block in iter_tour_blocks(n, stool):
+        stools = iter(block)
+        yield from zip(stools, stools)
+
+
+def iter_tour_blocks(n, stool):
+    """
+    Yield the moves of iter_tour_moves(n, stool) as bytes, holding the
+    source and destination stool of each move in turn, a sub-tour at a
+    time. Every stool must be below 256.
 
-        # Move n-i cheese rounds to an intermediate stool using all four rounds
-        move_four_stools(model, n-i, [stool[0], stool[2], stool[1], stool[3]])
+    Sub-tours short enough are copied from a template: the same sub-tour
+    solved on stools 0, 1, 2, ..., with each stool replaced by the
+    concrete one in a single bytes.translate.
 
-        # Move i cheese rounds
-        move_three_stools(model, i, [stool[0], stool[1], stool[3]])
+    @type n: int
+    @type stool: list[int]
+    @rtype: iterator[bytes]
+
+    >>> list(iter_tour_blocks(2, [0, 2, 1]))
+    [b'\\x00\\x01\\x00\\x02\\x01\\x02']
+    """
+    pending = [(n, tuple(stool))]
+    while pending:
+        (n, stool) = pending.pop()
+        if n <= 0:
+            continue
+        elif n == 1 or n <= _template_limit(len(stool)):
+            yield _tour_template(n, len(stool)).translate(
+                _translation(stool))
+        else:
+            for (part_n, _, part_stools) in reversed(_tour_parts(
+                    n, len(stool))):
+                pending.append((part_n, tuple([stool[s]
+                                               for s in part_stools])))
+
+
+def _template_limit(number_of_stools):
+    """
+    Return the most cheeses whose tour on number_of_stools (at least 3)
+    stools has at most TEMPLATE_MOVES moves.
+
+    @type number_of_stools: int
+    @rtype: int
+
+    >>> _template_limit(3) == (TEMPLATE_MOVES + 1).bit_length() - 1
+    True
+    """
+    key = (number_of_stools, TEMPLATE_MOVES)
+    if key not in _TEMPLATE_LIMITS:
+        n = 1
+        while min_number_of_moves(n + 1, number_of_stools) <= TEMPLATE_MOVES:
+            n += 1
+        _TEMPLATE_LIMITS[key] = n
+    return _TEMPLATE_LIMITS[key]
+
+
+def _translation(stool):
+    """
+    Return the bytes.translate table that replaces each stool s below
+    len(stool) with stool[s].
+
+    @type stool: tuple[int]
+    @rtype: bytes
+
+    >>> _translation((2, 0, 1))[:4]
+    b'\\x02\\x00\\x01\\x03'
+    """
+    return bytes(stool) + bytes(range(len(stool), 256))
 
-        # Move n-i smallest cheese rounds
-        move_four_stools(model, n-i, [stool[2], stool[1], stool[0], stool[3]])
+
+def _tour_template(n, number_of_stools):
+    """
+    Return the tour of n cheeses from stool 0 to stool 1 using stools 0
+    to number_of_stools - 1, as bytes holding the source and destination
+    stool of each move in turn, from the template cache, solving and
+    caching it from the templates of its parts if it is not there.
+
+    @type n: int
+    @type number_of_stools: int
+    @rtype: bytes
+
+    >>> list(_tour_template(2, 3))
+    [0, 2, 0, 1, 2, 1]
+    """
+    if n == 1:
+        return b'\x00\x01'
+    key = (n, number_of_stools)
+    template = _TEMPLATES.get(key)
+    if template is not None:
+        _TEMPLATES.move_to_end(key)
+        return template
+    template = b"".join(
+        [_tour_template(part_n, part_k).translate(_translation(part_stools))
+         for (part_n, part_k, part_stools) in _tour_parts(n, number_of_stools)
+         if part_n > 0])
+    _TEMPLATES[key] = template
+    size = sum(len(kept) for kept in _TEMPLATES.values())
+    while size > TEMPLATE_BYTES and len(_TEMPLATES) > 1:
+        size -= len(_TEMPLATES.popitem(last=False)[1])
+    return template
+
+
+def _iter_tour_moves(n, stool):
+    """
+    Yield the moves of iter_tour_moves(n, stool) one by one, for any
+    stools.
+
+    @type n: int
+    @type stool: list[int]
+    @rtype: iterator[tuple[int]]
+
+    >>> list(_iter_tour_moves(2, [0, 300, 1]))
+    [(0, 1), (0, 300), (1, 300)]
+    """
+    # pending sub-tours, the next one to run on top
+    pending = [(n, tuple(stool))]
+    while pending:
+        (n, stool) = pending.pop()
+        if n <= 0:
+            continue
+        elif n == 1:
+            yield (stool[0], stool[1])
+        elif len(stool) == 3:
+            yield from _iter_three_stool_moves(n, stool)
+        else:
+            i = generate_min_move_i(n, len(stool))
+            pending.append((n - i, (stool[2], stool[1], stool[0]) + stool[3:]))
+            pending.append((i, (stool[0], stool[1]) + stool[3:]))
+            pending.append((n - i, (stool[0], stool[2], stool[1]) + stool[3:]))
+
+
+def _tour_stools(number_of_stools):
+    """ Return the stool order for a tour from the first stool to the last.
+
+    @type number_of_stools: int
+    @rtype: list[int]
+
+    >>> _tour_stools(4)
+    [0, 3, 1, 2]
+    """
+    return [0, number_of_stools - 1] + list(range(1, number_of_stools - 1))
+
+
+def get_tour_move(n, i, number_of_stools=4):
+    """
+    Return move i (counting from 0) of the tour of n cheeses from the first
+    stool to the last, without generating the moves before it.
+
+    Each step descends into one of the three parts of a level of
+    move_k_stools, whose lengths come from the Frame-Stewart table.
+    Raise IndexError if the tour has no move i.
+
+    @type n: int
+    @type i: int
+    @type number_of_stools: int
+    @rtype: tuple[int]
+
+    >>> get_tour_move(5, 0)
+    (0, 3)
+    >>> get_tour_move(5, 12)
+    (0, 3)
+    >>> get_tour_move(3000, 10 ** 20)
+    (1, 0)
+    """
+    if not 0 <= i < min_number_of_moves(n, number_of_stools):
+        raise IndexError("tour of {0} cheeses has no move {1}".format(n, i))
+    stool = _tour_stools(number_of_stools)
+    while n > 1:
+        split = generate_min_move_i(n, len(stool))
+        first = min_number_of_moves(n - split, len(stool))
+        middle = min_number_of_moves(split, len(stool) - 1)
+        if i < first:
+            n -= split
+            stool = [stool[0], stool[2], stool[1]] + stool[3:]
+        elif i < first + middle:
+            i -= first
+            n = split
+            stool = [stool[0], stool[1]] + stool[3:]
+        else:
+            i -= first + middle
+            n -= split
+            stool = [stool[2], stool[1], stool[0]] + stool[3:]
+    return (stool[0], stool[1])
+
+
+def _tour_locations(n, i, stool):
+    """
+    Return the stool of each cheese (indexed by size - 1) after the first i
+    moves of the tour of n cheeses from stool[0] to stool[1].
+
+    @type n: int
+    @type i: int
+    @type stool: list[int]
+    @rtype: list[int]
+
+    >>> _tour_locations(3, 2, [0, 2, 1])
+    [2, 1, 0]
+    """
+    locations = [stool[0]] * n
+    # cheeses base + 1 to base + n are the ones still being moved
+    base = 0
+    while 0 < i < min_number_of_moves(n, len(stool)):
+        split = generate_min_move_i(n, len(stool))
+        first = min_number_of_moves(n - split, len(stool))
+        middle = min_number_of_moves(split, len(stool) - 1)
+        if i < first:
+            locations[base + n - split:base + n] = [stool[0]] * split
+            n -= split
+            stool = [stool[0], stool[2], stool[1]] + stool[3:]
+        elif i < first + middle:
+            locations[base:base + n - split] = [stool[2]] * (n - split)
+            i -= first
+            base += n - split
+            n = split
+            stool = [stool[0], stool[1]] + stool[3:]
+        else:
+            locations[base + n - split:base + n] = [stool[1]] * split
+            i -= first + middle
+            n -= split
+            stool = [stool[2], stool[1], stool[0]] + stool[3:]
+    location = stool[0] if i == 0 else stool[1]
+    locations[base:base + n] = [location] * n
+    return locations
+
+
+def _tour_parts(n, number_of_stools):
+    """
+    Return the parts of the tour of n cheeses from stool 0 to stool 1
+    using stools 0 to number_of_stools - 1, as (n, number_of_stools,
+    stools) triples: the tour of that many cheeses on that many stools,
+    with each stool s in it replaced by stools[s].
+
+    @type n: int
+    @type number_of_stools: int
+    @rtype: list[tuple[int, int, tuple[int]]]
+
+    >>> _tour_parts(3, 3)
+    [(2, 3, (0, 2, 1)), (1, 2, (0, 1)), (2, 3, (2, 1, 0))]
+    """
+    if number_of_stools == 3:
+        return [(n - 1, 3, (0, 2, 1)), (1, 2, (0, 1)), (n - 1, 3, (2, 1, 0))]
+    i = generate_min_move_i(n, number_of_stools)
+    rest = tuple(range(3, number_of_stools))
+    return [(n - i, number_of_stools, (0, 2, 1) + rest),
+            (i, number_of_stools - 1, (0, 1) + rest),
+            (n - i, number_of_stools, (2, 1, 0) + rest)]
+
+
+def get_tour_move_seq(n, number_of_stools=4):
+    """
+    Return the moves of the tour of n cheeses from the first stool to the
+    last as a GrammarMoveSequence, without generating them.
+
+    The tour of n cheeses on k stools is made of tours of fewer cheeses,
+    so the grammar has one rule for each (cheeses, stools) pair the tour
+    reaches: O(sqrt(n)) rules for four stools instead of the tour's
+    exponentially many moves.
+
+    @type n: int
+    @type number_of_stools: int
+    @rtype: GrammarMoveSequence
+
+    >>> from toah_model import MoveSequence
+    >>> get_tour_move_seq(10) == MoveSequence(iter_tour_moves(10, [0, 3, 1, 2]))
+    True
+    >>> move_seq = get_tour_move_seq(3000)
+    >>> move_seq.length() == min_number_of_moves(3000)
+    True
+    >>> move_seq.get_move(10 ** 20) == get_tour_move(3000, 10 ** 20)
+    True
+    """
+    min_number_of_moves(n, number_of_stools)
+    # rule for the tour of each (n, number_of_stools) pair, after rule 0,
+    # the single move
+    rules = [None]
+    rule_of = {}
+    pending = [(n, number_of_stools)]
+    while pending:
+        (m, k) = pending[-1]
+        if m <= 1 or (m, k) in rule_of:
+            pending.pop()
+            continue
+        parts = _tour_parts(m, k)
+        missing = [(part_n, part_k) for (part_n, part_k, _) in parts
+                   if part_n > 1 and (part_n, part_k) not in rule_of]
+        if missing:
+            pending.extend(missing)
+            continue
+        rule_of[(m, k)] = len(rules)
+        rules.append([(rule_of.get((part_n, part_k), 0), stools)
+                      for (part_n, part_k, stools) in parts if part_n > 0])
+    pieces = []
+    if n > 0:
+        pieces.append((rule_of.get((n, number_of_stools), 0),
+                       tuple(_tour_stools(number_of_stools))))
+    return GrammarMoveSequence(rules, pieces)
+
+
+def get_tour_model(n, i, number_of_stools=4):
+    """
+    Return a TOAHModel holding the configuration after the first i moves of
+    the tour of n cheeses from the first stool to the last, without
+    generating those moves.
+
+    Raise IndexError if the tour has fewer than i moves.
+
+    @type n: int
+    @type i: int
+    @type number_of_stools: int
+    @rtype: TOAHModel
+
+    >>> model = TOAHModel(4)
+    >>> model.fill_first_stool(6)
+    >>> tour_of_four_stools(model)
+    >>> model.get_move_seq().generate_toah_model(4, 6) == get_tour_model(6, 17)
+    True
+    """
+    if not 0 <= i <= min_number_of_moves(n, number_of_stools):
+        raise IndexError("tour of {0} cheeses has no move {1}".format(n, i))
+    model = TOAHModel(number_of_stools)
+    model.fill_stools(_tour_locations(n, i, _tour_stools(number_of_stools)))
+    return model
+
+
+def _animate_tour(model, delay_btw_moves):
+    """ Print model's tour move by move, starting from a full first stool.
+
+    @type model: TOAHModel
+    @type delay_btw_moves: float
+    @rtype: None
+    """
+    animate_model = TOAHModel(model.get_number_of_stools())
+    animate_model.fill_first_stool(model.get_number_of_cheeses())
+    renderer = TOAHRenderer(animate_model)
+    move_seq = model.get_move_seq()
+    print(renderer.render())
+    for i in range(move_seq.length()):
+        (src_stool, dst_stool) = move_seq.get_move(i)
+        time.sleep(delay_btw_moves)
+        animate_model.move(src_stool, dst_stool)
+        print(renderer.render())
 
 
 def tour_of_four_stools(model, delay_btw_moves=0.5, animate=False):
@@ -140,18 +636,47 @@ def tour_of_four_stools(model, delay_btw_moves=0.5, animate=False):
     @type animate: bool
         animate the tour or not
     """
-    move_four_stools(model, model.get_number_of_cheeses(), [0, 3, 1, 2])
+    model.apply_trusted_moves(
+        iter_tour_moves(model.get_number_of_cheeses(), [0, 3, 1, 2]))
+
+    if animate:
+        _animate_tour(model, delay_btw_moves)
+
+
+def tour_of_k_stools(model, delay_btw_moves=0.5, animate=False):
+    """Move a tower of cheeses from the first stool in model to the last,
+    using all of model's stools, and return the number of moves made.
+
+    The number of moves is known from the Frame-Stewart table before
+    any cheese is moved.
+
+    @type model: TOAHModel
+        TOAHModel with tower of cheese on first stool and the other
+        stools empty
+    @type delay_btw_moves: float
+        time delay between moves if animate is True
+    @type animate: bool
+        animate the tour or not
+    @rtype: int
+
+    >>> model = TOAHModel(5)
+    >>> model.fill_first_stool(10)
+    >>> tour_of_k_stools(model)
+    31
+    >>> model.number_of_moves()
+    31
+    """
+    number_of_stools = model.get_number_of_stools()
+    expected_moves = min_number_of_moves(model.get_number_of_cheeses(),
+                                         number_of_stools)
+    model.apply_trusted_moves(
+        iter_tour_moves(model.get_number_of_cheeses(),
+                        _tour_stools(number_of_stools)))
 
     if animate:
-        animate_model = TOAHModel(4)
-        animate_model.fill_first_stool(model.get_number_of_cheeses())
-        move_seq = model.get_move_seq()
-        print(animate_model)
-        for i in range(move_seq.length()):
-            (src_stool, dst_stool) = move_seq.get_move(i)
-            time.sleep(delay_btw_moves)
-            animate_model.move(src_stool, dst_stool)
-            print(animate_model)
+        _animate_tour(model, delay_btw_moves)
+    return expected_moves
+
 
 if __name__ == '__main__':
     NUM_CHEESES = 5